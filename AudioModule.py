@@ -3,7 +3,8 @@ import queue, os.path
 import numpy as np
 import pyaudio
 import wave
-from scipy import signal
+
+from resampler import StreamingResampler
 
 logging.basicConfig(level=20)
 
@@ -30,6 +31,7 @@ class Audio(object):
         self.sample_rate = self.RATE_PROCESS
         self.block_size = int(self.RATE_PROCESS / float(self.BLOCKS_PER_SECOND))
         self.block_size_input = int(self.input_rate / float(self.BLOCKS_PER_SECOND)) 
+        self._resampler = StreamingResampler(self.input_rate, self.RATE_PROCESS)
         self.pa = pyaudio.PyAudio()
 
         kwargs = {
@@ -56,17 +58,17 @@ class Audio(object):
         """
         Microphone may not support our native processing sampling rate, so
         resample from input_rate to RATE_PROCESS here for webrtcvad and
-        deepspeech
+        deepspeech. The resampler carries filter state from block to block, so
+        it must see every block of the stream in order.
 
         Args:
             data (binary): Input audio stream
             input_rate (int): Input audio rate to resample from
         """
-        data16 = np.fromstring(string=data, dtype=np.int16)
-        resample_size = int(len(data16) / self.input_rate * self.RATE_PROCESS)
-        resample = signal.resample(data16, resample_size)
-        resample16 = np.array(resample, dtype=np.int16)
-        return resample16.tostring()
+        if input_rate != self._resampler.in_rate:
+            self._resampler = StreamingResampler(input_rate, self.RATE_PROCESS)
+        data16 = np.frombuffer(data, dtype=np.int16).reshape(-1, self.CHANNELS)
+        return self._resampler.process(data16).tobytes()
 
     def read_resampled(self):
         """Return a block of audio data resampled to 16000hz, blocking if necessary."""
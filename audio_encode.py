@@ -0,0 +1,93 @@
+import io
+import wave
+import logging
+
+import numpy as np
+
+try:
+    import soundfile
+except (ImportError, OSError):  # OSError: the package is there but libsndfile is not
+    soundfile = None
+
+log = logging.getLogger(__name__)
+
+# Upload formats: extension the transcription API recognizes -> libsndfile (format, subtype).
+FORMATS = {
+    "flac": ("FLAC", "PCM_16"),   # lossless, ~2x smaller than WAV on speech
+    "ogg": ("OGG", "OPUS"),       # lossy, ~10x smaller; needs libsndfile >= 1.0.29
+    "wav": ("WAV", "PCM_16"),
+}
+
+
+class StreamingEncoder:
+    """
+    Encodes 16-bit mono PCM into an in-memory audio file as it is captured.
+
+    Pass it to `CobraDetector.wait_for_utterance(sink=...)`: every chunk of the
+    utterance is compressed as soon as it is final, so when capture ends only
+    the last few frames remain to encode and the upload can start at once.
+    Nothing touches the SD card. finish() returns a (filename, bytes) pair that
+    the OpenAI SDK accepts as an uploaded file.
+
+    Without soundfile/libsndfile (or when it lacks the requested codec) the
+    encoder falls back to an in-memory WAV, so the pipeline still works, just
+    with a bigger upload.
+
+    Usage:
+        encoder = StreamingEncoder(16000, "flac")
+        pcm = await detector.wait_for_utterance(sink=encoder)
+        text = await client.transcribe_audio(encoder.finish())
+    """
+
+    def __init__(self, sample_rate: int = 16000, fmt: str = "flac"):
+        if fmt not in FORMATS:
+            raise ValueError(f"`fmt` must be one of {sorted(FORMATS)}.")
+        self.sample_rate = sample_rate
+        self._buffer = io.BytesIO()
+        self._samples = 0
+        self._sf = None
+        self._wav = None
+        if fmt != "wav" and soundfile is not None:
+            container, subtype = FORMATS[fmt]
+            try:
+                self._sf = soundfile.SoundFile(self._buffer, mode="w", samplerate=sample_rate, channels=1,
+                                               format=container, subtype=subtype)
+            except (RuntimeError, ValueError, TypeError) as e:
+                log.warning("No %s encoder (%s); uploading WAV instead.", fmt, e)
+        if self._sf is None:
+            fmt = "wav"
+            self._wav = wave.open(self._buffer, "wb")
+            self._wav.setnchannels(1)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+        self.format = fmt
+
+    @property
+    def duration_s(self) -> float:
+        return self._samples / self.sample_rate
+
+    def write(self, pcm):
+        """Append int16 samples (array or raw bytes)."""
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        if len(samples) == 0:
+            return
+        self._samples += len(samples)
+        if self._sf is not None:
+            self._sf.write(samples)
+        else:
+            self._wav.writeframes(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+
+    def finish(self):
+        """Close the stream; returns (filename, encoded bytes)."""
+        if self._sf is not None:
+            self._sf.close()
+        else:
+            self._wav.close()  # patches the header sizes in the BytesIO
+        return f"utterance.{self.format}", self._buffer.getvalue()
+
+
+def encode_pcm(pcm, sample_rate: int = 16000, fmt: str = "flac"):
+    """One-shot encode of a whole utterance; returns (filename, bytes)."""
+    encoder = StreamingEncoder(sample_rate, fmt)
+    encoder.write(pcm)
+    return encoder.finish()
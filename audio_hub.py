@@ -0,0 +1,232 @@
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+from pvrecorder import PvRecorder
+
+from noise_floor import NoiseFloorTracker
+from pcm_ring import PcmRingBuffer
+
+SAMPLE_RATE = 16000
+# Hub block size: 10 ms is the gcd of the wake-word (1280) and VAD (480) frame
+# lengths, so every consumer frame completes on a block boundary and no consumer
+# waits on audio that has already been captured.
+BLOCK_LENGTH = 160
+# Seconds of audio kept in the shared ring; a consumer may lag this far behind.
+RING_SECONDS = 4.0
+
+log = logging.getLogger(__name__)
+
+
+class HubReader:
+    """
+    One consumer's cursor into the hub ring, re-framed to `frame_length` samples.
+
+    Mirrors the slice of the PvRecorder API the detectors use (start/read/stop/
+    delete), so a reader can stand in wherever a per-call recorder was opened.
+    read() returns a zero-copy int16 view into the ring (see PcmRingBuffer for
+    how long it stays valid). A reader that falls more than the ring capacity
+    behind skips its oldest audio; `overruns` counts how often that happened.
+    """
+
+    def __init__(self, hub, frame_length: int):
+        self._hub = hub
+        self.frame_length = frame_length
+        self._cursor = None
+
+    @property
+    def overruns(self) -> int:
+        return self._cursor.overruns if self._cursor is not None else 0
+
+    def start(self, backlog: int = 0):
+        self._cursor = self._hub.ring.cursor(backlog=backlog)
+
+    def stop(self):
+        self._cursor = None
+
+    def delete(self):
+        self.stop()
+
+    def backlog(self) -> int:
+        """Samples captured but not yet read by this reader."""
+        return self._cursor.available() if self._cursor is not None else 0
+
+    def read(self) -> np.ndarray:
+        """Block until one frame is available and return it."""
+        cursor = self._cursor
+        while True:
+            frame = cursor.read(self.frame_length)
+            if frame is not None:
+                return frame
+            self._hub._raise_if_failed()
+            self._hub.ring.wait(lambda: cursor.available() >= self.frame_length, timeout=0.5)
+
+
+class AudioHub:
+    """
+    Long-lived microphone capture shared by every audio consumer.
+
+    One PvRecorder is opened for the lifetime of the process and read on a
+    background thread into a shared PcmRingBuffer; every reader is just a cursor
+    into that ring, so fan-out costs the capture thread nothing per consumer and
+    no frame is allocated on the hot path. Wake-word and utterance capture
+    subscribe with their own frame lengths, so switching from one to the other
+    costs no device open/close and drops no audio in between.
+
+    With a `beamformer` (see beamform.py) the hub captures both ReSpeaker mics
+    through PyAudio instead of PvRecorder (which is mono only) and writes the
+    fused mono signal into the ring, so every consumer gets the beamformed audio.
+    `pyaudio_device_index` is then the PyAudio index, not the PvRecorder one.
+
+    The capture thread also keeps `noise_floor` (ambient RMS, minimum statistics
+    over the last few seconds) current, so consumers can gate on energy from
+    their first frame instead of measuring the room themselves.
+
+    Usage:
+        hub = AudioHub(device_index=-1)
+        hub.start()
+        reader = hub.subscribe(1280)
+        reader.start()
+        pcm = reader.read()
+        reader.stop()
+    """
+
+    realtime = True  # paced by the sample clock; consumers may drop frames to keep up
+
+    def __init__(self, device_index: int = -1, block_length: int = BLOCK_LENGTH,
+                 ring_seconds: float = RING_SECONDS, beamformer=None,
+                 pyaudio_device_index: int = None):
+        self.device_index = device_index
+        self.beamformer = beamformer
+        self.pyaudio_device_index = pyaudio_device_index
+        self.block_length = block_length
+        self.sample_rate = SAMPLE_RATE
+        self.ring = PcmRingBuffer(int(ring_seconds * SAMPLE_RATE))
+        self._noise = NoiseFloorTracker(SAMPLE_RATE)
+        self._running = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def subscribe(self, frame_length: int) -> HubReader:
+        return HubReader(self, frame_length)
+
+    @property
+    def position(self) -> int:
+        """Samples captured so far: a mark a reader can later start from (see HubReader.start)."""
+        return self.ring.written
+
+    @property
+    def noise_floor(self) -> float:
+        """Ambient RMS of the captured audio, or None until enough has been heard."""
+        return self._noise.floor
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.ring.notify()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise RuntimeError(f"audio hub capture failed: {self._error}")
+        if not self._running.is_set():
+            raise RuntimeError("audio hub is not running")
+
+    def _open_mono(self):
+        recorder = PvRecorder(frame_length=self.block_length, device_index=self.device_index)
+        recorder.start()
+        log.debug("Audio hub capturing from %s", recorder.selected_device)
+        # The int list converts straight into the ring slots; no intermediate
+        # array is built per block.
+        return recorder.read, recorder.delete
+
+    def _open_stereo(self):
+        import pyaudio
+        pa = pyaudio.PyAudio()
+        stream = pa.open(
+            format=pyaudio.paInt16,
+            channels=2,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.pyaudio_device_index,
+            frames_per_buffer=self.block_length,
+        )
+        log.debug("Audio hub capturing 2 channels from PyAudio device %s", self.pyaudio_device_index)
+
+        def read():
+            data = stream.read(self.block_length, exception_on_overflow=False)
+            return self.beamformer.process(np.frombuffer(data, dtype=np.int16).reshape(-1, 2))
+
+        def close():
+            stream.stop_stream()
+            stream.close()
+            pa.terminate()
+
+        return read, close
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            close = None
+            try:
+                read, close = self._open_stereo() if self.beamformer is not None else self._open_mono()
+                self._error = None
+                ring = self.ring
+                while self._running.is_set():
+                    block = read()
+                    ring.write(block)
+                    # Measure from the ring slots just written: no per-block array.
+                    self._noise.update(ring.view(ring.written - len(block), len(block)))
+            except Exception as e:
+                # Surface the failure to blocked readers, then reopen the device:
+                # the hub must outlive transient ALSA errors like the old per-call
+                # recorders did.
+                self._error = e
+                self.ring.notify()
+                log.error("Audio hub capture error: %s; reopening in 1s", e)
+                time.sleep(1.0)
+            finally:
+                if close is not None:
+                    close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print per-consumer frame rates from the shared audio hub.")
+    parser.add_argument('--audio_device_index', type=int, default=-1)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    hub = AudioHub(device_index=args.audio_device_index)
+    hub.start()
+    counts = {1280: 0, 480: 0}
+
+    def consume(frame_length):
+        reader = hub.subscribe(frame_length)
+        reader.start()
+        deadline = time.monotonic() + args.seconds
+        while time.monotonic() < deadline:
+            reader.read()
+            counts[frame_length] += 1
+        reader.stop()
+
+    threads = [threading.Thread(target=consume, args=(n,)) for n in counts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hub.stop()
+    for frame_length, n in counts.items():
+        print(f"{frame_length}-sample frames: {n / args.seconds:.1f}/s")
+
+
+if __name__ == '__main__':
+    main()
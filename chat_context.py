@@ -0,0 +1,149 @@
+import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+log = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+_MESSAGE_OVERHEAD = 4  # role and separators per message, as in OpenAI's counting recipe
+
+
+class TokenCounter:
+    """
+    Local token count for chat messages: tiktoken's encoding for `model` when
+    tiktoken is installed, otherwise ~4 characters per token, which is close
+    enough for a budget (it overestimates Polish slightly, never by much).
+    """
+
+    def __init__(self, model: str = None):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model or "")
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        # Old messages are counted on every request; their text never changes.
+        self.count = lru_cache(maxsize=2048)(self._count)
+
+    def _count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def message(self, m: dict) -> int:
+        return self.count(m.get("content") or "") + _MESSAGE_OVERHEAD
+
+    def messages(self, messages: list[dict]) -> int:
+        return sum(self.message(m) for m in messages) + 3
+
+
+def _is_summary(m: dict) -> bool:
+    return m.get("role") == "system" and (m.get("content") or "").startswith(SUMMARY_PREFIX)
+
+
+class ContextWindow:
+    """
+    Builds the prompt for each request from the ChatHistory within a token budget.
+
+    The prompt is: the pinned head of the history (the starter prompt from
+    chatHistory.starter.json), the rolling summary if there is one, the most
+    recent `keep_turns` exchanges verbatim, and the new user message. If that
+    still exceeds `budget_tokens`, the oldest verbatim exchanges are left out
+    of this request.
+
+    Exchanges older than the last `keep_turns` are folded into the summary by
+    summarize(): the coroutine `summarizer(previous_summary, messages) -> str`
+    condenses them, and the history is spliced so it holds pinned head +
+    summary + recent turns. That is an LLM call of its own, so
+    maybe_summarize() is run as a background task between interactions,
+    never while a reply is awaited.
+    Nothing is folded until at least `fold_min_turns` old exchanges have
+    accumulated, to batch the summary calls.
+    """
+
+    def __init__(self, history, counter: TokenCounter = None, summarizer=None, budget_tokens: int = 2500,
+                 keep_turns: int = 6, fold_min_turns: int = 2, pinned: int = None):
+        self.history = history
+        self.counter = counter or TokenCounter()
+        self.summarizer = summarizer
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.fold_min_turns = fold_min_turns
+        self.pinned = pinned
+        self._summarizing = False
+
+    def _pinned(self, messages: list[dict]) -> int:
+        if self.pinned is not None:
+            return min(self.pinned, len(messages))
+        # Unknown starter (e.g. a journal loaded without a reset): pin the leading system prompt.
+        n = 0
+        while n < len(messages) and messages[n].get("role") == "system" and not _is_summary(messages[n]):
+            n += 1
+        return n
+
+    def _split(self, messages: list[dict]):
+        """(head, summary list, old turns, recent turns) of a history snapshot."""
+        n = self._pinned(messages)
+        head, rest = messages[:n], messages[n:]
+        summary = rest[:1] if rest and _is_summary(rest[0]) else []
+        turns = rest[len(summary):]
+        cut = max(0, len(turns) - 2 * self.keep_turns)
+        # Recent turns start at a user message, so an exchange is never cut in half.
+        while cut < len(turns) and turns[cut].get("role") != "user":
+            cut += 1
+        return head, summary, turns[:cut], turns[cut:]
+
+    def build(self, prompt: str) -> list[dict]:
+        """The messages to send for `prompt`; the last one is the new user message."""
+        head, summary, _, recent = self._split(self.history.messages)
+        user = {"role": "user", "content": prompt}
+        count = self.counter
+        total = count.messages(head + summary + [user]) + sum(count.message(m) for m in recent)
+        while recent and total > self.budget_tokens:
+            total -= count.message(recent.pop(0))
+            while recent and recent[0].get("role") != "user":
+                total -= count.message(recent.pop(0))
+        if total > self.budget_tokens:
+            log.warning("Chat context of %d tokens exceeds the %d-token budget with no history left to drop.",
+                        total, self.budget_tokens)
+        return head + summary + recent + [user]
+
+    def needs_summary(self) -> bool:
+        _, _, old, _ = self._split(self.history.messages)
+        return self.summarizer is not None and len(old) >= 2 * self.fold_min_turns
+
+    async def summarize(self) -> bool:
+        """Fold the old exchanges into the summary (an LLM call); True if the history changed."""
+        if self.summarizer is None or self._summarizing:
+            return False
+        self._summarizing = True
+        try:
+            messages = self.history.messages
+            head, summary, old, _ = self._split(messages)
+            if len(old) < 2 * self.fold_min_turns:
+                return False
+            previous = summary[0]["content"][len(SUMMARY_PREFIX):] if summary else ""
+            try:
+                text = (await self.summarizer(previous, old)).strip()
+            except Exception as e:
+                log.warning("Chat summary failed, keeping the history as it is: %s", e)
+                return False
+            if not text:
+                return False
+            # Only appends can have happened meanwhile, so the indices still hold.
+            start = len(head)
+            self.history.splice(start, start + len(summary) + len(old),
+                                [{"role": "system", "content": SUMMARY_PREFIX + text}])
+            log.debug("Folded %d messages into the chat summary", len(old))
+            return True
+        finally:
+            self._summarizing = False
+
+    async def maybe_summarize(self):
+        """summarize() once enough old exchanges have piled up; meant to run as a background task."""
+        if self.needs_summary():
+            await self.summarize()
@@ -1,59 +1,147 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DEFAULT_CONNECTION_LIMITS
 import os
-import json
+import time
+import asyncio
+import logging
 from dotenv import load_dotenv
+from sentence_splitter import SentenceSplitter
+from chat_history import ChatHistory
+from chat_context import ContextWindow, TokenCounter
+
+log = logging.getLogger(__name__)
+
+def make_async_client(api_key: str = None, base_url: str = None, max_connections: int = 8,
+                      keepalive_s: float = 90.0) -> AsyncOpenAI:
+    # one AsyncOpenAI for STT, chat and TTS: its httpx pool keeps TLS
+    # connections open between requests (httpx drops idle ones after 5 s by
+    # default, which is shorter than a pause in a conversation)
+    api_key = api_key or os.getenv("OPENAI_API_KEY") or os.getenv("CHATGPT_API_KEY")
+    # Limits is built from the httpx the SDK itself imports (its default
+    # limits' class), so the pool settings can never mismatch its transport
+    limits = type(DEFAULT_CONNECTION_LIMITS)(max_connections=max_connections,
+                                             max_keepalive_connections=max_connections,
+                                             keepalive_expiry=keepalive_s)
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=60.0, max_retries=2,
+                       http_client=DefaultAsyncHttpxClient(limits=limits))
 
 class OpenAIClient:
-    def __init__(self, api_key: str, model: str, history_file: str = "chatHistory.json"):
-        # initialize the new client; picks up your key directly
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str, history_file: str = "chatHistory.jsonl", base_url: str = None,
+                 context_tokens: int = 2500, keep_turns: int = 6, client: AsyncOpenAI = None):
+        # async client with a keep-alive connection pool; pass `client` to share
+        # one pool with speak.py (speak.set_client(ai_client.client))
+        # base_url points the client at another OpenAI-compatible server (e.g. tests/mock_stt_server.py)
+        self.client = client or make_async_client(api_key, base_url)
         self.model = model
+        # history lives in memory; history_file is its append-only journal
         self.history_file = history_file
+        self.history = ChatHistory(history_file)
+        # each request gets the starter prompt, a rolling summary and the last
+        # keep_turns exchanges, within context_tokens
+        self.context = ContextWindow(self.history, TokenCounter(model), summarizer=self.summarize_turns,
+                                     budget_tokens=context_tokens, keep_turns=keep_turns)
+
+    def reset_history(self, starter: list[dict]):
+        # start over from the starter prompt, which stays pinned at the top of every request
+        self.history.reset(starter)
+        self.context.pinned = len(starter)
+
+    async def warm_up(self):
+        # open (or refresh) a pooled connection before it is needed: DNS, TCP
+        # and TLS are paid here, e.g. while the wake-word intro is playing;
+        # a small authenticated request that is cheap on both ends
+        started = time.monotonic()
+        try:
+            await self.client.with_options(max_retries=0, timeout=5.0).models.retrieve(self.model)
+            log.debug("OpenAI connection warm in %.2fs", time.monotonic() - started)
+        except Exception as e:
+            log.debug("OpenAI warm-up failed: %s", e)
 
-    def list_models(self) -> list[str]:
+    async def list_models(self) -> list[str]:
         # list available models
-        resp = self.client.models.list()
+        resp = await self.client.models.list()
         return [m.id for m in resp.data]  # resp.data is a list of Model objects :contentReference[oaicite:0]{index=0}
 
-    def call_chatgpt(self, messages: list[dict]) -> str:
+    async def call_chatgpt(self, messages: list[dict]) -> str:
         # new chat completion call
-        completion = self.client.chat.completions.create(
+        completion = await self.client.chat.completions.create(
             model=self.model,
             messages=messages
         )
         return completion.choices[0].message.content.strip()  # same structure, but new method :contentReference[oaicite:1]{index=1}
 
-    def call_chatgpt_with_history(self, prompt: str, retain_history: bool = True) -> str:
-        # load existing history or start fresh
-        try:
-            with open(self.history_file, "r") as f:
-                messages = json.load(f)
-        except FileNotFoundError:
-            messages = []
+    async def stream_chatgpt(self, messages: list[dict]):
+        # streamed chat completion: yields the text deltas as the model produces them
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-        # append user prompt
-        messages.append({"role": "user", "content": prompt})
+    async def summarize_turns(self, previous: str, turns: list[dict]) -> str:
+        # condense old exchanges for ContextWindow; runs between interactions
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+        if previous:
+            transcript = f"Summary so far: {previous}\n\n{transcript}"
+        return await self.call_chatgpt([
+            {"role": "system", "content": "Condense this conversation between a user and the Useless Box "
+                                          "(Octo and Coral) into at most five short sentences. Keep facts about "
+                                          "the user, promises, running jokes and open questions; drop filler."},
+            {"role": "user", "content": transcript},
+        ])
+
+    async def call_chatgpt_with_history(self, prompt: str, retain_history: bool = True) -> str:
+        # the history is in memory: no file read on the way to the request;
+        # the context window ends with the user prompt
+        messages = self.context.build(prompt)
         # get assistant response
-        response_text = self.call_chatgpt(messages)
+        response_text = await self.call_chatgpt(messages)
 
         if retain_history:
-            messages.append({"role": "assistant", "content": response_text})
-            with open(self.history_file, "w") as f:
-                json.dump(messages, f, indent=2)
+            # journaled on a background thread, off the response path
+            self.history.append(messages[-1], {"role": "assistant", "content": response_text})
 
         print(response_text)
         return response_text
-    def transcribe_audio(self, audio_file: str) -> str:
-        # transcribe audio file
-        with open(audio_file, "rb") as f:
-            response = self.client.audio.transcriptions.create(
-                file=f,
-                model="whisper-1",
-                response_format="text"
-            )
-        return response
 
-if __name__ == "__main__":
+    async def stream_chatgpt_with_history(self, prompt: str, retain_history: bool = True):
+        # same as call_chatgpt_with_history, but yields the reply sentence by
+        # sentence while it is still being generated, so TTS can start on the
+        # first sentence; the history is written once the stream is complete
+        messages = self.context.build(prompt)
+
+        splitter = SentenceSplitter()
+        parts = []
+        async for delta in self.stream_chatgpt(messages):
+            parts.append(delta)
+            for sentence in splitter.feed(delta):
+                yield sentence
+        for sentence in splitter.flush():
+            yield sentence
+        response_text = "".join(parts).strip()
+
+        if retain_history:
+            # journaled on a background thread, off the response path
+            self.history.append(messages[-1], {"role": "assistant", "content": response_text})
+
+        print(response_text)
+
+    async def transcribe_audio(self, audio) -> str:
+        # `audio` is a file path, or an in-memory upload as a (filename, bytes)
+        # pair, e.g. from audio_encode.StreamingEncoder.finish(); the filename
+        # extension tells the API the format (utterance.flac, utterance.wav, ...)
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio = (os.path.basename(audio), f.read())
+        return await self.client.audio.transcriptions.create(
+            file=audio,
+            model="whisper-1",
+            response_format="text"
+        )
+
+async def _demo():
     load_dotenv()
     # support either env var name
     api_key = os.getenv("CHATGPT_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -62,9 +150,12 @@ if __name__ == "__main__":
     client = OpenAIClient(api_key, model)
 
     # show available models
-    print("Available models:", client.list_models())
+    print("Available models:", await client.list_models())
 
     # sample run
     prompt = "What are the benefits of exercise?"
-    chat_response = client.call_chatgpt_with_history(prompt)
+    chat_response = await client.call_chatgpt_with_history(prompt)
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
 
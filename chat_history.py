@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+_RESET = {"reset": True}  # journal record: the history starts over from the records after it
+
+
+class ChatHistory:
+    """
+    Conversation history kept in memory, persisted as an append-only journal.
+
+    `messages` is the list sent with every chat request; reading it costs
+    nothing. Each new message is appended in memory and handed, as one compact
+    JSON line, to a writer thread, so no disk I/O happens on the caller's path.
+    The writer flushes every line to the OS right away but fsyncs at most every
+    `fsync_interval_s`, one SD card sync per conversation instead of one per
+    line.
+
+    reset(), replace() and splice() rewrite the history (the starter prompt at
+    boot, a summary in place of old turns) by journaling a reset marker
+    followed by the new messages, so every write stays a sequential append. Once the journal
+    has grown to more than twice the live history (and `min_compact_lines`),
+    the writer compacts it: the history is written to a temporary file that is
+    renamed over the journal.
+
+    A journal left by a previous run is loaded at construction.
+    """
+
+    def __init__(self, path: str = "chatHistory.jsonl", fsync_interval_s: float = 2.0, min_compact_lines: int = 64):
+        self.path = path
+        self.fsync_interval_s = fsync_interval_s
+        self.min_compact_lines = min_compact_lines
+        self._lock = threading.Lock()
+        self._messages, self._journal_lines, torn = self._load(path)
+        self._queue = queue.Queue()
+        if torn:
+            # Appending after a torn line would glue the next record onto it.
+            self._queue.put(("compact", list(self._messages)))
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="chat-history", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _load(path: str):
+        """History replayed from the journal, its record count, and whether its last line was torn or unterminated."""
+        messages, lines, torn = [], 0, False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        torn = True  # a line cut short by a power loss ends the journal
+                        break
+                    lines += 1
+                    if record == _RESET:
+                        messages = []
+                    else:
+                        messages.append(record)
+                    if not line.endswith("\n"):
+                        torn = True  # cut before its newline: the next append would glue onto it
+        except FileNotFoundError:
+            pass
+        return messages, lines, torn
+
+    @property
+    def messages(self) -> list[dict]:
+        """Snapshot of the history; the caller may extend it freely."""
+        with self._lock:
+            return list(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def _journal_locked(self, records):
+        for r in records:
+            self._queue.put(("line", json.dumps(r, ensure_ascii=False)))
+        self._journal_lines += len(records)
+        if self._journal_lines > max(self.min_compact_lines, 2 * len(self._messages)):
+            self._queue.put(("compact", list(self._messages)))
+            self._journal_lines = len(self._messages)
+
+    def append(self, *messages: dict):
+        with self._lock:
+            self._messages.extend(messages)
+            self._journal_locked(messages)
+
+    def replace(self, messages: list[dict]):
+        """Swap the whole history, e.g. for a summarized one."""
+        with self._lock:
+            self._messages = list(messages)
+            self._journal_locked([_RESET] + self._messages)
+
+    def splice(self, start: int, end: int, messages: list[dict]):
+        """Replace messages[start:end] (e.g. old turns by their summary), atomically with respect to appends."""
+        with self._lock:
+            self._messages[start:end] = messages
+            self._journal_locked([_RESET] + self._messages)
+
+    def reset(self, messages: list[dict]):
+        """Start over from `messages` (the starter prompt): what resetChatHistory does at boot."""
+        self.replace(messages)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            timeout = max(0.0, last_sync + self.fsync_interval_s - time.monotonic()) if dirty else None
+            try:
+                kind, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind, payload = None, None
+            if kind == "close":
+                break
+            try:
+                if kind == "compact":
+                    self._rewrite(payload)
+                    dirty = False
+                    last_sync = time.monotonic()
+                elif kind == "line":
+                    if self._file is None:
+                        self._file = open(self.path, "a", encoding="utf-8")
+                    self._file.write(payload + "\n")
+                    self._file.flush()
+                    dirty = True
+                if dirty and time.monotonic() - last_sync >= self.fsync_interval_s:
+                    os.fsync(self._file.fileno())
+                    dirty = False
+                    last_sync = time.monotonic()
+            except OSError as e:
+                log.warning("Chat history journal write failed: %s", e)
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def _rewrite(self, messages: list[dict]):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for m in messages:
+                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def close(self):
+        """Write and sync everything queued; the history stays readable in memory."""
+        self._queue.put(("close", None))
+        self._thread.join()
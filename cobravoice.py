@@ -1,20 +1,73 @@
 import os
 import sys
 import argparse
-import struct
 import wave
 import asyncio
-from collections import deque
 from datetime import datetime
 
 import math
 
-import webrtcvad
+import numpy as np
 from pvrecorder import PvRecorder
 
+from vad_backends import VAD_BACKENDS, VadBackend, make_vad_backend
 
-def _rms(frame) -> float:
-    return math.sqrt(sum(s * s for s in frame) / len(frame))
+
+def _rms(frame: np.ndarray) -> float:
+    # float64 dot: int16 squares would overflow, and a Python-level sum over the
+    # samples is the slowest thing in the frame loop.
+    x = frame.astype(np.float64)
+    return math.sqrt(np.dot(x, x) / len(x))
+
+
+class _UtteranceBuffer:
+    """
+    Growable int16 buffer one utterance is captured into, frame by frame.
+
+    Each frame is read straight into `slot()`, so the energy check, the VAD and
+    the final PCM all use that one copy; nothing is packed or joined per frame.
+    Until start() the first `preroll_frames` slots are used as a ring; start()
+    rotates them into order and they become the utterance's first frames. The
+    buffer doubles when it fills, so a short reply costs a few seconds of memory
+    and a long one a handful of copies.
+    """
+
+    def __init__(self, frame_length: int, preroll_frames: int, initial_frames: int = 160):
+        self.frame_length = frame_length
+        self.preroll_frames = max(1, preroll_frames)
+        self._data = np.empty(frame_length * max(initial_frames, self.preroll_frames + 1), dtype=np.int16)
+        self.started = False
+        self.frames = 0   # committed utterance frames, pre-roll included
+        self._onset = 0   # frames written to the pre-roll ring
+
+    def slot(self) -> np.ndarray:
+        """Writable view of the next frame."""
+        n = self.frame_length
+        i = self.frames if self.started else self._onset % self.preroll_frames
+        if (i + 1) * n > len(self._data):
+            grown = np.empty(2 * len(self._data), dtype=np.int16)
+            grown[:i * n] = self._data[:i * n]
+            self._data = grown
+        return self._data[i * n:(i + 1) * n]
+
+    def commit(self):
+        if self.started:
+            self.frames += 1
+        else:
+            self._onset += 1
+
+    def start(self):
+        """Speech began: keep the pre-roll (oldest first) as the first frames."""
+        n = self.frame_length
+        kept = min(self._onset, self.preroll_frames)
+        if self._onset > self.preroll_frames:
+            head = self._onset % self.preroll_frames
+            self._data[:kept * n] = np.roll(self._data[:kept * n], -head * n)
+        self.frames = kept
+        self.started = True
+
+    def pcm(self) -> np.ndarray:
+        return self._data[:self.frames * self.frame_length]
 
 
 class CobraDetector:
@@ -29,6 +82,10 @@ class CobraDetector:
     Improvements over the Cobra version:
     - a ~300ms pre-roll ring buffer, so the first syllable is not clipped
     - a max_utterance_s cap, so a noisy room cannot record forever
+    - optional adaptive endpointing (`endpointer`), closing short commands after
+      ~0.45 s of silence instead of `silence_timeout`
+    - a pluggable VAD engine (`vad_backend`: "webrtc", "energy", "neural" or a
+      vad_backends.VadBackend); batched backends get `batch_frames` frames per call
     """
 
     FRAME_MS = 30  # webrtcvad accepts 10/20/30ms frames
@@ -40,31 +97,61 @@ class CobraDetector:
         device_index: int = -1,
         sample_rate: int = 16000,
         max_utterance_s: float = 15.0,
+        hub=None,  # shared AudioHub; None opens a private PvRecorder per call
+        vad_backend="webrtc",
+        vad_model: str = None,  # model file for the "neural" backend
+        endpointer=None,  # endpointing.AdaptiveEndpointer; None = fixed silence_timeout
     ):
         self.device_index = device_index
+        self.hub = hub
         self.sample_rate = sample_rate
         self.frame_length = sample_rate * self.FRAME_MS // 1000  # 480 @ 16k
         self.max_utterance_s = max_utterance_s
+        if not isinstance(vad_backend, VadBackend):
+            vad_backend = make_vad_backend(vad_backend, model_path=vad_model)
+        self.vad = vad_backend
+        self.endpointer = endpointer
+
+    def _open_recorder(self):
+        if self.hub is not None:
+            return self.hub.subscribe(self.frame_length)
+        return PvRecorder(frame_length=self.frame_length, device_index=self.device_index)
 
     async def wait_for_utterance(
         self,
         threshold: float = 0.5,
         silence_timeout: float = 1.0,
         onset_timeout: float = 8.0,
+        sink=None,
+        since: int = None,
     ) -> bytes:
         """
         Listen for speech: start when voice activity is detected, stop after
-        silence_timeout seconds without speech. Returns raw PCM bytes, or b""
+        silence_timeout seconds without speech (with an `endpointer`, after its
+        adaptive hangover, at most silence_timeout). Returns raw PCM bytes, or b""
         when no speech started within onset_timeout seconds (the caller must
         treat an empty result as "nothing was said" and move on — blocking
         forever here wedges the whole device with the servo up).
 
-        `threshold` maps to webrtcvad aggressiveness: <0.4 -> 1 (permissive),
-        <0.7 -> 2, else 3 (strict).
+        `threshold` is passed to the VAD backend: webrtcvad maps it to
+        aggressiveness (<0.4 -> 1 permissive, <0.7 -> 2, else 3 strict), the
+        neural backend uses it as the speech probability cut-off.
+
+        `sink` (e.g. audio_encode.StreamingEncoder) gets the utterance audio in
+        order as it is captured, via sink.write(int16 array), so encoding can
+        overlap capture. Nothing is written when no speech starts.
+
+        `since` is a hub position (`hub.position`) taken earlier: capture starts
+        there instead of now, replaying what the hub ring still holds (up to its
+        length, 4 s), so speech that began before this call is not lost.
         """
-        aggressiveness = 1 if threshold < 0.4 else (2 if threshold < 0.7 else 3)
-        vad = webrtcvad.Vad(aggressiveness)
-        recorder = PvRecorder(frame_length=self.frame_length, device_index=self.device_index)
+        vad = self.vad
+        vad.reset()
+        endpointer = self.endpointer
+        if endpointer is not None:
+            endpointer.reset(self.frame_length / self.sample_rate, silence_timeout)
+        batch = max(1, min(vad.batch_frames, round(0.3 / (self.frame_length / self.sample_rate))))
+        recorder = self._open_recorder()
 
         loop = asyncio.get_running_loop()
         frame_time = self.frame_length / self.sample_rate
@@ -73,56 +160,86 @@ class CobraDetector:
         max_onset_wait = max(1, int(onset_timeout / frame_time))
         start_votes_needed = 2  # 60ms of speech to trigger (debounces clicks)
 
-        preroll = deque(maxlen=round(0.3 / frame_time))
+        # The pre-roll ring also holds the rest of the batch the onset frame came in.
+        buffer = _UtteranceBuffer(self.frame_length, preroll_frames=round(0.3 / frame_time) + batch - 1)
         onset_waited = 0
-        frames = []
-        started = False
         speech_votes = 0
         silent_frames = 0
+        fed = 0  # samples already handed to `sink`
+
+        def read_into(slot):
+            # Hub readers hand back int16 ring views, PvRecorder an int list;
+            # either way this is the only copy the frame gets.
+            slot[:] = recorder.read()
+            return slot
 
         try:
-            recorder.start()
-
-            # The ReSpeaker emits a transient right after capture starts, and its noise
-            # floor alone can read as speech to webrtcvad. Discard the first ~240ms AND
-            # use those frames to measure ambient energy; speech then requires real
-            # acoustic energy above the ambient baseline as well as a VAD vote.
-            ambient = []
-            for _ in range(8):
-                warm = await loop.run_in_executor(None, recorder.read)
-                ambient.append(_rms(warm))
-            # Gate only the noise-floor-reads-as-speech pathology: adapt to quiet rooms
-            # but cap the floor so speech passes even when warm-up caught a loud room.
-            energy_floor = min(max(200.0, 3.0 * (sum(ambient) / len(ambient))), 800.0)
+            if since is not None and self.hub is not None:
+                recorder.start(backlog=max(0, self.hub.position - since))
+            else:
+                recorder.start()
+
+            # The hub tracks the room's noise floor continuously (and never restarts
+            # capture, so there is no start-up transient): gate from the first frame.
+            ambient_rms = getattr(self.hub, "noise_floor", None)
+            if ambient_rms is None:
+                # Private recorder: the ReSpeaker emits a transient right after capture
+                # starts, and its noise floor alone can read as speech to webrtcvad.
+                # Discard the first ~240ms AND use those frames to measure ambient energy.
+                ambient = []
+                for _ in range(8):
+                    warm = await loop.run_in_executor(None, read_into, buffer.slot())
+                    ambient.append(_rms(warm))
+                ambient_rms = sum(ambient) / len(ambient)
+            # Speech requires real acoustic energy above the ambient baseline as well as
+            # a VAD vote. Gate only the noise-floor-reads-as-speech pathology: adapt to
+            # quiet rooms but cap the floor so speech passes even in a loud room.
+            energy_floor = min(max(200.0, 3.0 * ambient_rms), 800.0)
 
             while True:
-                pcm_frame = await loop.run_in_executor(None, recorder.read)
-                raw = struct.pack("h" * len(pcm_frame), *pcm_frame)
-                is_speech = (vad.is_speech(raw, self.sample_rate)
-                             and _rms(pcm_frame) >= energy_floor)
-
-                if not started:
-                    preroll.append(raw)
-                    speech_votes = speech_votes + 1 if is_speech else 0
-                    if speech_votes >= start_votes_needed:
-                        started = True
-                        frames.extend(preroll)
-                        preroll.clear()
-                    else:
-                        onset_waited += 1
-                        if onset_waited >= max_onset_wait:
-                            return b""
-                else:
-                    frames.append(raw)
-                    if is_speech:
-                        silent_frames = 0
+                # A batch is read into consecutive buffer slots and classified in
+                # one backend call; decisions are then replayed frame by frame.
+                views = []
+                for _ in range(batch):
+                    views.append(await loop.run_in_executor(None, read_into, buffer.slot()))
+                    buffer.commit()
+                block = views[0][None] if batch == 1 else np.stack(views)
+                x = block.astype(np.float64)
+                rms = np.sqrt(np.einsum("ij,ij->i", x, x) / block.shape[1])
+                decisions = vad.is_speech(block, threshold) & (rms >= energy_floor)
+
+                stop = False
+                for i, is_speech in enumerate(decisions):
+                    if not buffer.started:
+                        speech_votes = speech_votes + 1 if is_speech else 0
+                        if speech_votes >= start_votes_needed:
+                            # The rest of the batch is already in the pre-roll ring
+                            # and comes along with it.
+                            buffer.start()
+                        else:
+                            onset_waited += 1
+                            if onset_waited >= max_onset_wait:
+                                return b""
+                    elif endpointer is not None:
+                        stop = endpointer.update(block[i], is_speech, rms[i])
                     else:
-                        silent_frames += 1
-                        if silent_frames >= max_silent:
-                            break
-                    if len(frames) >= max_frames:
+                        if is_speech:
+                            silent_frames = 0
+                        else:
+                            silent_frames += 1
+                            stop = silent_frames >= max_silent
+                    if buffer.started:
+                        stop = stop or buffer.frames - (batch - 1 - i) >= max_frames
+                    if stop:
+                        buffer.frames -= batch - 1 - i  # frames read past the end
                         break
-            return b"".join(frames)
+                if sink is not None and buffer.started:
+                    pcm = buffer.pcm()
+                    sink.write(pcm[fed:])
+                    fed = len(pcm)
+                if stop:
+                    break
+            return buffer.pcm().tobytes()
         finally:
             recorder.delete()
 
@@ -142,11 +259,13 @@ class CobraDetector:
 
 
 def main():
-    parser = argparse.ArgumentParser(description="VAD-based utterance detector (webrtcvad)")
+    parser = argparse.ArgumentParser(description="VAD-based utterance detector")
     parser.add_argument("--device_index", type=int, default=-1, help="Audio device index")
     parser.add_argument("--threshold", type=float, default=0.5, help="Start threshold")
     parser.add_argument("--silence_timeout", type=float, default=1.0, help="Seconds of silence to stop")
     parser.add_argument("--out_dir", type=str, default='.', help="Directory for WAV output")
+    parser.add_argument("--vad_backend", choices=VAD_BACKENDS, default="webrtc")
+    parser.add_argument("--vad_model", help="Model file for --vad_backend neural (.onnx or .tflite)")
     parser.add_argument("--show_devices", action="store_true", help="List audio devices")
     args = parser.parse_args()
 
@@ -154,7 +273,8 @@ def main():
         CobraDetector.show_audio_devices()
         sys.exit(0)
 
-    detector = CobraDetector(device_index=args.device_index)
+    detector = CobraDetector(device_index=args.device_index, vad_backend=args.vad_backend,
+                             vad_model=args.vad_model)
 
     print(f"Waiting for utterance (threshold={args.threshold}, silence={args.silence_timeout}s)")
     pcm = asyncio.run(detector.wait_for_utterance(args.threshold, args.silence_timeout))
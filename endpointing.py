@@ -0,0 +1,124 @@
+from collections import deque
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _pitch_hz(frame: np.ndarray, sample_rate: int = SAMPLE_RATE, fmin: float = 70.0, fmax: float = 400.0):
+    """Autocorrelation pitch of one frame, or None when it is not clearly voiced."""
+    x = frame.astype(np.float32)
+    x -= x.mean()
+    n = len(x)
+    spectrum = np.fft.rfft(x, 2 * n)
+    ac = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+    if ac[0] <= 0:
+        return None
+    lo, hi = int(sample_rate / fmax), min(n - 1, int(sample_rate / fmin))
+    lag = lo + int(np.argmax(ac[lo:hi]))
+    if ac[lag] / ac[0] < 0.3:
+        return None
+    return sample_rate / lag
+
+
+class AdaptiveEndpointer:
+    """
+    End-of-utterance decision that adapts to how the speaker pauses.
+
+    The fixed rule ends a turn after `silence_timeout` of non-speech, so every
+    short command carries a second of dead air. Here the allowed silence
+    (hangover) starts at `base_s` and grows with what the utterance has shown:
+    `pause_factor` times the longest pause so far in which the speaker went on
+    talking, plus `growth_s` per second of speech (long sentences get longer
+    thinking pauses). It is always kept within [`min_s`, silence_timeout]. A
+    two-word command therefore closes after ~0.45 s, while someone who has
+    already paused for 0.6 s mid-sentence gets 0.9 s.
+
+    With `prosody`, a phrase-final cue also closes the turn after `min_s`: the
+    last voiced frames are clearly quieter than the utterance's median speech
+    energy, and their pitch has fallen (or no pitch was found).
+
+    One instance serves one CobraDetector; reset() is called per utterance.
+    """
+
+    def __init__(
+        self,
+        min_s: float = 0.3,
+        base_s: float = 0.45,
+        growth_s: float = 0.08,
+        pause_factor: float = 1.5,
+        prosody: bool = False,
+        tail_frames: int = 5,
+        energy_drop: float = 0.6,
+        pitch_drop: float = 0.92,
+    ):
+        self.min_s = min_s
+        self.base_s = base_s
+        self.growth_s = growth_s
+        self.pause_factor = pause_factor
+        self.prosody = prosody
+        self.energy_drop = energy_drop
+        self.pitch_drop = pitch_drop
+        self._tail = tail_frames
+        self.reset(0.03, 1.0)
+
+    def reset(self, frame_s: float, silence_timeout: float):
+        self.frame_s = frame_s
+        self.max_s = max(self.min_s, silence_timeout)
+        self.speech_frames = 0
+        self.longest_pause = 0  # frames
+        self._silent = 0
+        self._energies = []
+        self._pitches = []
+        self._recent_energy = deque(maxlen=self._tail)
+        self._recent_pitch = deque(maxlen=self._tail)
+
+    @property
+    def hangover_s(self) -> float:
+        """Silence that currently ends the utterance."""
+        adaptive = max(self.base_s + self.growth_s * self.speech_frames * self.frame_s,
+                       self.pause_factor * self.longest_pause * self.frame_s)
+        return min(max(adaptive, self.min_s), self.max_s)
+
+    def _phrase_final(self) -> bool:
+        if len(self._energies) < 2 * self._tail:
+            return False
+        if np.mean(self._recent_energy) >= self.energy_drop * np.median(self._energies):
+            return False
+        pitches = [p for p in self._recent_pitch if p is not None]
+        if not pitches or len(self._pitches) < self._tail:
+            return True
+        return np.mean(pitches[-2:]) < self.pitch_drop * np.median(self._pitches)
+
+    def update(self, frame: np.ndarray, is_speech: bool, rms: float) -> bool:
+        """Feed one frame of a started utterance; True when the utterance has ended."""
+        if is_speech:
+            if self._silent:
+                # The speaker went on after this pause: it was mid-utterance.
+                self.longest_pause = max(self.longest_pause, self._silent)
+            self._silent = 0
+            self.speech_frames += 1
+            self._energies.append(rms)
+            self._recent_energy.append(rms)
+            if self.prosody:
+                pitch = _pitch_hz(frame)
+                self._recent_pitch.append(pitch)
+                if pitch is not None:
+                    self._pitches.append(pitch)
+            return False
+        self._silent += 1
+        if self.prosody and self._silent >= round(self.min_s / self.frame_s) and self._phrase_final():
+            return True
+        return self._silent >= round(self.hangover_s / self.frame_s)
+
+
+ENDPOINTING_MODES = ("fixed", "adaptive", "prosody")
+
+
+def make_endpointer(mode: str = "fixed"):
+    """Endpointer by config name; "fixed" (None) keeps CobraDetector's silence_timeout rule."""
+    if mode == "fixed":
+        return None
+    if mode in ("adaptive", "prosody"):
+        return AdaptiveEndpointer(prosody=mode == "prosody")
+    raise ValueError(f"Unknown endpointing mode '{mode}'; expected one of {ENDPOINTING_MODES}.")
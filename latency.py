@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-spaced histogram of durations, cheap enough to feed per frame.
+
+    `bins` edges span `min_s` to `max_s` geometrically (~15% wide with the
+    defaults), plus an underflow and an overflow bucket, so memory is constant
+    however long the box runs and percentiles are accurate to one bucket width.
+    record() is a binary search and an increment; reading is thread-safe with
+    respect to one writer.
+
+    Usage:
+        hist = LatencyHistogram()
+        hist.record(0.063)
+        hist.summary()   # {"count": 1, "mean_ms": 63.0, "p50_ms": ..., ...}
+    """
+
+    def __init__(self, min_s: float = 0.0005, max_s: float = 2.0, bins: int = 60):
+        self.edges = np.geomspace(min_s, max_s, bins + 1)
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value_s: float):
+        i = int(np.searchsorted(self.edges, value_s, side="right"))
+        with self._lock:
+            self.counts[i] += 1
+            self.total_s += value_s
+            if value_s > self.max_s:
+                self.max_s = value_s
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th percentile (0-100), in seconds."""
+        with self._lock:
+            counts = self.counts.copy()
+            max_s = self.max_s
+        n = counts.sum()
+        if n == 0:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(counts), q / 100.0 * n, side="left"))
+        if i == 0:
+            return min(float(self.edges[0]), max_s)
+        if i > len(self.edges) - 1:
+            return max_s
+        return min(float(self.edges[i]), max_s)
+
+    def summary(self) -> dict:
+        n = self.count
+        return {
+            "count": n,
+            "mean_ms": round(1000 * self.total_s / n, 2) if n else 0.0,
+            "p50_ms": round(1000 * self.percentile(50), 2),
+            "p90_ms": round(1000 * self.percentile(90), 2),
+            "p99_ms": round(1000 * self.percentile(99), 2),
+            "max_ms": round(1000 * self.max_s, 2),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.counts[:] = 0
+            self.total_s = 0.0
+            self.max_s = 0.0
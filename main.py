@@ -5,14 +5,21 @@ import argparse
 from datetime import datetime
 from halo import Halo
 from dotenv import load_dotenv
-from openai import OpenAI
 from cobravoice import CobraDetector
+from vad_backends import VAD_BACKENDS
+from audio_encode import StreamingEncoder
+from streaming_stt import SegmentedTranscriber
+from endpointing import ENDPOINTING_MODES, make_endpointer
+from audio_hub import AudioHub
+from replay import ReplayHub
+from beamform import DelayAndSumBeamformer
 from chat_gpt_client import OpenAIClient
 import sounds
-from wakeword import WakeWordDetector
+from wakeword import WakeWordDetector, SilenceGate, AdaptiveThresholds
+from score_journal import ScoreJournal
 import speak
 import asyncio
-import shutil
+import json
 import time
 from hand import HandServo
 from top import TopServo
@@ -32,10 +39,29 @@ class MainApplication:
         
         logging.debug("Logging configured.Starting Main Application")
         self.args = args
-        self.detector = CobraDetector()
-        self.ai_client =  OpenAIClient(api_key=os.getenv("CHATGPT_API_KEY"), model=os.getenv("GPT_MODEL_TYPE"), history_file="chatHistory.json")
+        speak.configure_cache(args.tts_cache_mb)
+        # One always-open mic shared by wake-word and utterance capture: no device
+        # reopen (and no lost speech) between the wake word and the command.
+        # --file swaps the mic for a recording, replayed as fast as it is consumed.
+        # --beamform captures both ReSpeaker mics (PyAudio index --device) and
+        # fuses them with the delay-and-sum beamformer before any detector runs.
+        beamformer = DelayAndSumBeamformer() if args.beamform else None
+        if args.file:
+            self.audio_hub = ReplayHub.from_wav(args.file, beamformer=beamformer)
+        else:
+            self.audio_hub = AudioHub(beamformer=beamformer,
+                                      pyaudio_device_index=args.device if beamformer else None)
+        self.audio_hub.start()
+        self.detector = CobraDetector(hub=self.audio_hub, vad_backend=args.vad_backend, vad_model=args.vad_model,
+                                      endpointer=make_endpointer(args.endpointing))
+        self.ai_client =  OpenAIClient(api_key=os.getenv("CHATGPT_API_KEY"), model=os.getenv("GPT_MODEL_TYPE"), history_file="chatHistory.jsonl",
+                                       context_tokens=args.context_tokens, keep_turns=args.keep_turns)
+        # one pooled async client for STT, chat and TTS
+        speak.set_client(self.ai_client.client)
         self.spinner = Halo(spinner='line') if not self.args.nospinner else None
         self.listening_for_command = False
+        self.summary_task = None
+        self.warm_task = None
         self.current_folder = os.getcwd()
         # openWakeWord models (trained in wakeword-forge 2026-07); filename stems map to
         # the legacy keyword names main.py routes on: hey_octo -> "hey-octo", etc.
@@ -51,27 +77,42 @@ class MainApplication:
         # Per-keyword thresholds compensate; coral stays at the strict default.
         self.wakeword = WakeWordDetector(model_paths=wake_models,
                                          thresholds={"hey-octo": 0.5,
-                                                     "knight-rider": 0.45})
+                                                     "knight-rider": 0.45},
+                                         hub=self.audio_hub,
+                                         # the room is quiet most of the time: skip
+                                         # inference there and leave the CPU to LEDs/servos
+                                         silence_gate=SilenceGate(),
+                                         # learn the room's background scores and trigger
+                                         # relative to them (fixed thresholds +-0.15/0.25)
+                                         adaptive=AdaptiveThresholds() if args.adaptive_thresholds else None,
+                                         # per-frame scores (24 h ring) + audio before each trigger
+                                         journal=ScoreJournal(args.score_journal) if args.score_journal else None)
+        # Drop a retrained model into models/ or edit wakeword_thresholds.json
+        # ({"thresholds": {"hey-octo": 0.5}}) and it is picked up live — no restart.
+        self.wakeword.watch(models_dir=os.path.join(_here, "models"),
+                            thresholds_file=os.path.join(_here, "wakeword_thresholds.json"))
         self.handServo = HandServo()
         self.topServo = TopServo()
-        self.openAiClient = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         
         self.resetChatHistory()
         logging.debug("MainApplication initialized")
 
-    def resetChatHistory(self, sourceFile="chatHistory.starter.json", destinationFile="chatHistory.json"):
+    def resetChatHistory(self, sourceFile="chatHistory.starter.json"):
         logging.debug("Resetting chat history")
         if not os.path.exists(sourceFile):
             logging.debug(f"Error: Starter chat history '{sourceFile}' does not exist.")
             sys.exit(1)
         try:
-            shutil.copyfile(sourceFile, destinationFile)
-            logging.debug(f"Successfully overwritten '{destinationFile}' with '{sourceFile}'")
+            with open(sourceFile, "r", encoding="utf-8") as f:
+                starter = json.load(f)
+            # the in-memory history starts over; its journal records the reset
+            self.ai_client.reset_history(starter)
+            logging.debug(f"Chat history reset from '{sourceFile}' ({len(starter)} messages)")
         except FileNotFoundError:
             logging.debug(f"Error: Source file '{sourceFile}' not found.")
             sys.exit(1)
-        except PermissionError:
-            logging.debug(f"Error: Permission denied when writing to '{destinationFile}'.")
+        except json.JSONDecodeError as e:
+            logging.debug(f"Error: Starter chat history '{sourceFile}' is not valid JSON: {e}")
             sys.exit(1)
         except Exception as e:
             logging.debug(f"An unexpected error occurred: {e}")
@@ -126,18 +167,23 @@ class MainApplication:
         logging.debug("Waiting for wakeword...")   
         result, keyword = await self.wakeword.wait_for_wakeword()
         active_keyword = None
+        loop = asyncio.get_running_loop()
+        if keyword in ("hey-octo", "hey-coral"):
+            # DNS, TCP and TLS to the API are set up while the intro plays (in a
+            # worker thread, so the event loop is free to run the warm-up).
+            self.warm_task = asyncio.create_task(self.ai_client.warm_up())
         if keyword == "hey-octo":
             print("Detected wake word 'Hey Octo'")
             active_keyword = "Hey Octo! "
             self.topServo.up()
             wsled.on()
-            play_random_ash()
+            await loop.run_in_executor(None, play_random_ash)
         elif keyword == "hey-coral":
             print("Detected wake word 'Hey Coral'")
             active_keyword = "Hey Coral! "
             self.topServo.up()
             wsled.on()
-            play_random_coral()        
+            await loop.run_in_executor(None, play_random_coral)
         elif keyword == "knight-rider":
             print("Detected wake word 'Knight Rider'")
             self.KnightRider()
@@ -145,9 +191,12 @@ class MainApplication:
         else:
             print(f"Detected unknown wake word: {keyword}")
             return False
+        # Capture starts from here, once the intro has finished: the mic hears the
+        # intro itself (there is no echo cancellation), so audio from under it
+        # would reach the VAD and the transcript. What is said after it, during
+        # the connectivity check, is replayed from the hub ring.
+        listen_from = self.audio_hub.position
         logging.debug("Wakeword detected, starting command processing")
-        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-        wav_path = os.path.join(self.args.savewav, f"utt_{ts}.wav")
         try:
             if not await self.is_internet_available():
                 print("No internet connection detected ? playing offline placeholder only.")                
@@ -157,19 +206,49 @@ class MainApplication:
             print("Speak now...")
             wsled.listening()
             print(f"Waiting for utterance ")
-            pcm = await self.detector.wait_for_utterance()
+            # The utterance is compressed while it is being captured and uploaded
+            # straight from memory; it only reaches the SD card with --savewav.
+            # Segmented STT uploads each phrase as soon as the speaker pauses.
+            if self.args.stt == "segmented":
+                sink = SegmentedTranscriber(self.ai_client.transcribe_audio, self.detector.sample_rate,
+                                            self.args.upload_format)
+            else:
+                sink = StreamingEncoder(self.detector.sample_rate, self.args.upload_format)
+            pcm = await self.detector.wait_for_utterance(sink=sink, since=listen_from)
             if not pcm:
                 print("No speech after wake word — going back to sleep.")
                 return True  # servo down & LED off in finally
 
-            self.detector.save_wav(pcm, wav_path)
-            print(f"Saved utterance to {wav_path}")
+            if self.args.savewav:
+                ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+                wav_path = os.path.join(self.args.savewav, f"utt_{ts}.wav")
+                self.detector.save_wav(pcm, wav_path)
+                print(f"Saved utterance to {wav_path}")
             wsled.thinking()
             #use whisper for stt and then ask chatgpt for response
-            stt = self.ai_client.transcribe_audio(wav_path)
+            if self.args.stt == "segmented":
+                stt = await sink.finish()
+            else:
+                stt = await self.ai_client.transcribe_audio(sink.finish())
             print(f"Transcribed text: {stt}")
+            if self.args.reply == "stream":
+                # Each sentence goes to TTS as soon as the model has finished it,
+                # so the box starts talking while the rest is still generated.
+                async def sentences():
+                    first = True
+                    async for sentence in self.ai_client.stream_chatgpt_with_history(active_keyword + stt):
+                        if first:
+                            wsled.speaking()
+                            self.topServo.up()   # lid sagged during STT/GPT; re-raise so the reply comes from an open box
+                            first = False
+                        yield sentence
+                if active_keyword == "Hey Octo! ":
+                    await speak.speak_male_stream(sentences())
+                elif active_keyword == "Hey Coral! ":
+                    await speak.speak_female_stream(sentences())
+                return True
             #use chatgpt for response
-            response = self.ai_client.call_chatgpt_with_history(active_keyword + stt)
+            response = await self.ai_client.call_chatgpt_with_history(active_keyword + stt)
             print(f"ChatGPT response: {response}")
             #use tts for response
             wsled.speaking()
@@ -182,10 +261,11 @@ class MainApplication:
         finally:
             self.topServo.down()
             wsled.off()
-            if os.path.exists(wav_path):
-                os.remove(wav_path)
             self.listening_for_command = False
             print("Listening stopped.")
+            # fold old exchanges into the rolling summary while the box is idle
+            if self.summary_task is None or self.summary_task.done():
+                self.summary_task = asyncio.create_task(self.ai_client.context.maybe_summarize())
     
     def subscribe_toggle(self):
         while True:
@@ -308,6 +388,9 @@ class MainApplication:
         while True:
             try:
                 await self.listen_for_command()
+            except EOFError:
+                logging.info("Replay file finished.")
+                return
             except Exception as e:
                 logging.error(f"Error in listen_for_command loop: {e}")
                 # small back-off before retrying
@@ -319,9 +402,21 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Stream from microphone using VAD and OpenAI Whisper API")
     parser.add_argument('-v', '--vad_aggressiveness', type=int, default=3, help="Set aggressiveness of VAD: an integer between 0 and 3, 0 being the least aggressive about filtering out non-speech, 3 the most aggressive.")
     parser.add_argument('--nospinner', action='store_true', help="Disable spinner")
-    parser.add_argument('-w', '--savewav', default=os.path.join(os.getcwd(),'audio/saved/'), help="Save .wav files of utterances to given directory")
+    parser.add_argument('-w', '--savewav', default=None, help="Debugging: keep a .wav of every utterance in the given directory (e.g. audio/saved/)")
+    parser.add_argument('--stt', choices=['segmented', 'single'], default='segmented', help="segmented: transcribe phrases in parallel while the user is still talking; single: one request after the utterance")
+    parser.add_argument('--reply', choices=['stream', 'whole'], default='stream', help="stream: speak the reply sentence by sentence while it is generated; whole: wait for the complete reply")
+    parser.add_argument('--context_tokens', type=int, default=2500, help="Token budget of each chat request (starter prompt + summary + recent turns)")
+    parser.add_argument('--keep_turns', type=int, default=6, help="Recent exchanges sent verbatim; older ones are folded into a rolling summary")
+    parser.add_argument('--tts_cache_mb', type=int, default=128, help="Disk budget of the cache of rendered TTS sentences (0 disables it)")
+    parser.add_argument('--upload_format', choices=['flac', 'ogg', 'wav'], default='flac', help="Utterance encoding for transcription uploads (flac lossless, ogg = Opus, smallest)")
     parser.add_argument('-f', '--file', help="Read from .wav file instead of microphone")
     parser.add_argument('-d', '--device', type=int, default=1, help="Device input index (Int) as listed by pyaudio.PyAudio.get_device_info_by_index(). If not provided, falls back to PyAudio.get_default_device().")
+    parser.add_argument('--adaptive_thresholds', action='store_true', help="Trigger wake words relative to the learned background score level instead of fixed thresholds")
+    parser.add_argument('--score_journal', help="Record every wake-word score to this rotating binary file (read with score_journal.py) and save the audio before each trigger next to it")
+    parser.add_argument('--vad_backend', choices=VAD_BACKENDS, default='webrtc', help="Utterance VAD engine: webrtcvad, energy gate only, or a neural frame classifier (--vad_model)")
+    parser.add_argument('--vad_model', help="Model file (.onnx or .tflite) for --vad_backend neural")
+    parser.add_argument('--endpointing', choices=ENDPOINTING_MODES, default='fixed', help="End of utterance: fixed 1s silence, adaptive to the speaker's pauses, or adaptive plus falling energy/pitch")
+    parser.add_argument('--beamform', action='store_true', help="Capture both ReSpeaker mics and beamform them into one channel")
     parser.add_argument('-r', '--rate', type=int, default=16000, help="Input device sample rate. Default: 16000. Your device may require 44100.")
     args = parser.parse_args()
     if args.savewav:
@@ -0,0 +1,59 @@
+import math
+from collections import deque
+
+import numpy as np
+
+
+class NoiseFloorTracker:
+    """
+    Minimum-statistics estimate of the ambient noise level of a PCM stream.
+
+    Every block's power is smoothed with a ~`smoothing_s` time constant, and the
+    floor is the minimum of that smoothed power over the last `window_s` seconds,
+    scaled by `bias` because the minimum of a fluctuating power sits below its
+    mean. The window is kept as `subwindows` sub-window minima, so the update is
+    O(1) per block and a rise in room noise is followed within one window, while
+    speech, which keeps dipping to the floor between words, barely moves it.
+
+    `floor` is an RMS value (int16 units), directly comparable with a frame RMS,
+    or None until one sub-window has been seen. Written by one thread (the audio
+    hub's capture thread); reading `floor` from another thread is safe.
+
+    Usage:
+        tracker = NoiseFloorTracker(16000)
+        tracker.update(block)          # every captured block
+        tracker.floor                  # e.g. 42.0
+    """
+
+    def __init__(self, sample_rate: int, window_s: float = 5.0, subwindows: int = 8,
+                 smoothing_s: float = 0.1, bias: float = 1.25):
+        self.sample_rate = sample_rate
+        self.sub_s = window_s / subwindows
+        self.smoothing_s = smoothing_s
+        self.bias = bias
+        self.floor = None
+        self._minima = deque(maxlen=subwindows - 1)  # completed sub-windows
+        self._smoothed = None
+        self._sub_min = math.inf
+        self._sub_elapsed = 0.0
+
+    def update(self, block: np.ndarray):
+        n = len(block)
+        if n == 0:
+            return
+        x = np.asarray(block).astype(np.float32)
+        power = float(np.dot(x, x)) / n
+        block_s = n / self.sample_rate
+        if self._smoothed is None:
+            self._smoothed = power
+        else:
+            a = math.exp(-block_s / self.smoothing_s)
+            self._smoothed = a * self._smoothed + (1.0 - a) * power
+        self._sub_min = min(self._sub_min, self._smoothed)
+        self._sub_elapsed += block_s
+        if self._sub_elapsed >= self.sub_s:
+            self._minima.append(self._sub_min)
+            self._sub_min = math.inf
+            self._sub_elapsed = 0.0
+        if self._minima:
+            self.floor = math.sqrt(self.bias * min(min(self._minima), self._sub_min))
@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+
+
+class PcmRingBuffer:
+    """
+    Fixed-size int16 ring buffer with any number of independent reader cursors.
+
+    Storage is one preallocated array of twice the capacity: every sample is
+    written at `i` and `i + capacity`, so any window of up to `capacity` samples
+    is contiguous and readers get zero-copy views instead of fresh arrays. The
+    writer never blocks and never waits on readers; a cursor that falls more than
+    `capacity` samples behind detects the overrun itself and skips forward.
+
+    A view returned by `RingCursor.read` stays valid until the writer has written
+    another `capacity - len(view)` samples. Consumers that keep a frame longer
+    than that (or hand it to another thread with an unbounded queue) must copy it.
+
+    Usage:
+        ring = PcmRingBuffer(4 * 16000)
+        cursor = ring.cursor()
+        ring.write(samples)            # capture thread
+        frame = cursor.read(480)       # None until 480 new samples exist
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("`capacity` must be positive.")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.int16)
+        self._written = 0  # total samples ever written; readers compare against it
+        self._cond = threading.Condition()
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def write(self, samples):
+        """Append samples (any int sequence or array); only the newest `capacity` are kept."""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[n - self.capacity:]
+            self._written += n - self.capacity
+            n = self.capacity
+        cap = self.capacity
+        start = self._written % cap
+        first = min(n, cap - start)
+        # Lower and mirrored upper copy; the tail that wraps lands at the front.
+        self._data[start:start + first] = samples[:first]
+        self._data[start + cap:start + cap + first] = self._data[start:start + first]
+        if first < n:
+            rest = n - first
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = self._data[:rest]
+        with self._cond:
+            self._written += n  # publish only after the samples are in place
+            self._cond.notify_all()
+
+    def view(self, position: int, n: int) -> np.ndarray:
+        """Zero-copy view of `n` samples starting at absolute `position`."""
+        start = position % self.capacity
+        return self._data[start:start + n]
+
+    def cursor(self, backlog: int = 0) -> "RingCursor":
+        """New reader starting `backlog` samples before the current write position."""
+        backlog = max(0, min(backlog, self.capacity, self._written))
+        return RingCursor(self, self._written - backlog)
+
+    def wait(self, predicate, timeout: float = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(predicate, timeout=timeout)
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class RingCursor:
+    """One reader's position in a PcmRingBuffer, with its own overrun accounting."""
+
+    def __init__(self, ring: PcmRingBuffer, position: int):
+        self._ring = ring
+        self.position = position
+        self.overruns = 0         # times the writer lapped this cursor
+        self.dropped_samples = 0  # audio lost to those overruns
+
+    def available(self) -> int:
+        return self._ring.written - self.position
+
+    def _check_overrun(self):
+        behind = self._ring.written - self.position
+        if behind > self._ring.capacity:
+            lost = behind - self._ring.capacity
+            self.position += lost
+            self.overruns += 1
+            self.dropped_samples += lost
+
+    def read(self, n: int):
+        """Return a view of the next `n` samples, or None if they are not written yet."""
+        if n > self._ring.capacity:
+            raise ValueError(f"cannot read {n} samples from a ring of {self._ring.capacity}")
+        self._check_overrun()
+        if self.available() < n:
+            return None
+        frame = self._ring.view(self.position, n)
+        self.position += n
+        return frame
+
+    def skip_to_latest(self):
+        self.position = self._ring.written
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # OSError: the package is there but PortAudio is not
+    sd = None
+
+log = logging.getLogger(__name__)
+
+
+def default_output_rate(device=None, fallback: int = 48000) -> int:
+    """Native rate of the output device; `fallback` where there is no PortAudio (e.g. warming caches elsewhere)."""
+    if sd is None:
+        return fallback
+    return int(sd.query_devices(device, kind='output')['default_samplerate'])
+
+
+class JitterBuffer:
+    """
+    FIFO of int16 frames between a network producer and an audio callback.
+
+    Playback of a stream starts once `prefill` seconds are buffered (or the
+    producer has already finished), so short hiccups in the TTS download do
+    not reach the speaker. The prefill adapts: an underrun in the middle of a
+    stream pauses output until it is buffered again and grows the prefill by
+    `growth` (up to `max_prefill_s`); every stream that plays through without
+    one lets it shrink by `decay` back towards `min_prefill_s`. On a good
+    connection the first words therefore play ~`min_prefill_s` after the first
+    chunk arrives.
+
+    write() is called by the producer, read() from the audio callback; both are
+    cheap and only hold the lock to move array references.
+    """
+
+    def __init__(self, sample_rate: int, channels: int = 2, min_prefill_s: float = 0.06,
+                 max_prefill_s: float = 0.5, growth: float = 1.5, decay: float = 0.9):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.min_prefill = int(min_prefill_s * sample_rate)
+        self.max_prefill = int(max_prefill_s * sample_rate)
+        self.growth = growth
+        self.decay = decay
+        self.prefill = self.min_prefill
+        self.underruns = 0
+        self._blocks = deque()
+        self._offset = 0  # frames of _blocks[0] already played
+        self._buffered = 0
+        self._primed = False
+        self._ended = True
+        self._stream_underruns = 0
+        self._lock = threading.Lock()
+        self.drained = threading.Event()
+        self.drained.set()
+
+    @property
+    def buffered_s(self) -> float:
+        return self._buffered / self.sample_rate
+
+    def begin(self):
+        """Start a new stream; adapts the prefill to how the last one went."""
+        with self._lock:
+            if not self._stream_underruns:
+                self.prefill = max(self.min_prefill, int(self.prefill * self.decay))
+            self._stream_underruns = 0
+            self._primed = False
+            self._ended = False
+            self.drained.clear()
+
+    def write(self, frames: np.ndarray):
+        if len(frames) == 0:
+            return
+        with self._lock:
+            self._blocks.append(frames)
+            self._buffered += len(frames)
+
+    def end(self):
+        """No more writes for this stream; whatever is buffered plays out."""
+        with self._lock:
+            self._ended = True
+            if not self._buffered:
+                self.drained.set()
+
+    def read(self, out: np.ndarray):
+        """Fill `out` (frames x channels); silence where nothing is due."""
+        n = len(out)
+        filled = 0
+        with self._lock:
+            if not self._primed and (self._buffered >= self.prefill or self._ended):
+                self._primed = True
+            while self._primed and filled < n and self._blocks:
+                block = self._blocks[0]
+                take = min(n - filled, len(block) - self._offset)
+                out[filled:filled + take] = block[self._offset:self._offset + take]
+                filled += take
+                self._offset += take
+                self._buffered -= take
+                if self._offset == len(block):
+                    self._blocks.popleft()
+                    self._offset = 0
+            if filled < n and self._primed and not self._ended:
+                # The producer fell behind: wait for a bigger cushion next time.
+                self.underruns += 1
+                self._stream_underruns += 1
+                self.prefill = min(self.max_prefill, int(self.prefill * self.growth))
+                self._primed = False
+            if self._ended and not self._buffered:
+                self.drained.set()
+        out[filled:] = 0
+        return filled
+
+
+class StreamPlayer:
+    """
+    One persistent PortAudio output stream fed through a JitterBuffer.
+
+    Opening the device (and querying its rate) happens once; afterwards each
+    utterance is begin() / write() ... / end() / wait(), and the stream is only
+    stopped while idle so other players (pydub, pyaudio) can use the card in
+    between. Everything written between begin() and end() plays back to back,
+    without gaps.
+
+    Usage:
+        player = StreamPlayer()
+        player.begin()
+        for frames in chunks:      # int16, shape (n, channels)
+            player.write(frames)
+        player.end()
+        await player.drain()
+    """
+
+    def __init__(self, sample_rate: int = None, channels: int = 2, device=None, blocksize: int = 512, **buffer_args):
+        if sd is None:
+            raise RuntimeError("sounddevice is not available.")
+        self.device = device
+        self.sample_rate = sample_rate or default_output_rate(device)
+        self.channels = channels
+        self.buffer = JitterBuffer(self.sample_rate, channels, **buffer_args)
+        self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=channels, dtype='int16',
+                                       device=device, blocksize=blocksize, callback=self._callback)
+        self._first_audio = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status.output_underflow:
+            log.debug("PortAudio output underflow")
+        if self.buffer.read(outdata) and self._first_audio is None:
+            self._first_audio = time.monotonic()
+
+    def begin(self):
+        self._first_audio = None
+        self.buffer.begin()
+        if not self._stream.active:
+            self._stream.start()
+
+    def write(self, frames: np.ndarray):
+        self.buffer.write(frames)
+
+    def end(self):
+        self.buffer.end()
+
+    @property
+    def first_audio(self):
+        """monotonic() time the current stream's first samples went to the card, or None."""
+        return self._first_audio
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the stream has played out, then stop the device; False on timeout."""
+        if not self.buffer.drained.wait(timeout):
+            return False
+        # Let the last callback period reach the DAC before stopping.
+        time.sleep(self._stream.latency)
+        self._stream.stop()
+        return True
+
+    async def drain(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.wait)
+
+    def close(self):
+        self._stream.close()
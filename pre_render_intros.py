@@ -1,26 +1,9 @@
 #!/usr/bin/env python3
+"""Warms the TTS cache with the wake-word intros and writes their clips for intro_player.py."""
+import argparse
 import asyncio
-import os
-import wave
-import time
-import numpy as np
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
-import traceback
 
-load_dotenv()
-
-# === TTS constants (as in your module) ===
-_BASE_RATE   = 24_000           # native TTS sample rate
-DEFAULT_GAIN = 2.0
-STYLE = (
-    "Tone: witty, dry sarcasm, cocky confidence.\n"
-    "Emotion: amused contempt.\n"
-    "Delivery: quick pace, short pauses, ends with a smug chuckle."
-)
-
-# your OpenAI client
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import speak
 
 # five intros per character
 INTROS = {
@@ -70,69 +53,12 @@ INTROS = {
     }
 }
 
-def _ensure_dirs():
-    for role in INTROS:
-        path = f"audio/tts/{role}"
-        os.makedirs(path, exist_ok=True)
-
-def _open_wav(path: str):
-    wf = wave.open(path, "wb")
-    wf.setnchannels(2)             # stereo
-    wf.setsampwidth(2)             # 16-bit
-    wf.setframerate(_BASE_RATE)    # true TTS rate
-    return wf
-
-async def _render_voice(role: str, desc: str, text: str):
-    """
-    Fetches the full PCM stream, applies gain, and writes
-    a stereo WAV with one channel active (left for ash, right for coral).
-    """
-    voice = "ash" if role == "ash" else "coral"
-    left_channel = (role == "ash")   # ash (Octo) ? left, coral ? right
-
-    filename = f"audio/tts/{role}/{role}_intro_{desc}.wav"
-    print(f"? Rendering {filename!r} ?")
-
-    # 1) fetch all TTS PCM
-    buf = bytearray()
-    try:
-        async with client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
-            voice=voice,
-            instructions=STYLE,
-            input=text,
-            response_format="pcm"
-        ) as resp:
-            async for chunk in resp.iter_bytes():
-                buf.extend(chunk)
-    except Exception:
-        print(f"? Failed to fetch TTS for {role}/{desc}")
-        traceback.print_exc()
-        return
-
-    # 2) decode & gain
-    pcm = np.frombuffer(buf, dtype=np.int16).astype(np.int32)
-    pcm = np.clip(pcm * DEFAULT_GAIN, -32768, 32767).astype(np.int16)
-
-    # 3) build stereo array
-    if left_channel:
-        stereo = np.column_stack((pcm, np.zeros_like(pcm)))
-    else:
-        stereo = np.column_stack((np.zeros_like(pcm), pcm))
-
-    # 4) write WAV file
-    wf = _open_wav(filename)
-    wf.writeframes(stereo.tobytes())
-    wf.close()
-    print(f"? Saved {filename}")
-
 async def main():
-    _ensure_dirs()
-    tasks = []
-    for role, intros in INTROS.items():
-        for desc, phrase in intros.items():
-            tasks.append(_render_voice(role, desc, phrase))
-    await asyncio.gather(*tasks)
+    parser = argparse.ArgumentParser(description="Render the wake intros into the TTS cache and audio/tts/.")
+    parser.add_argument('--play_rate', type=int, default=None,
+                        help="Output rate to cache for (default: this machine's output device)")
+    args = parser.parse_args()
+    await speak.warm(INTROS, "intro", args.play_rate)
     print("All intros rendered.")
 
 if __name__ == "__main__":
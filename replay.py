@@ -0,0 +1,233 @@
+import os
+import sys
+import glob
+import json
+import time
+import wave
+import asyncio
+import argparse
+
+import numpy as np
+
+from noise_floor import NoiseFloorTracker
+from endpointing import ENDPOINTING_MODES
+from vad_backends import VAD_BACKENDS
+from resampler import StreamingResampler
+
+SAMPLE_RATE = 16000
+BEAM_BLOCK_LENGTH = 160  # the live hub's block size, so replayed steering matches
+
+
+def load_wav(path: str, sample_rate: int = SAMPLE_RATE, beamformer=None) -> np.ndarray:
+    """
+    Read a 16-bit WAV as mono int16 at `sample_rate`.
+
+    Multi-channel files are averaged, or, for 2-channel ReSpeaker recordings with
+    a `beamformer`, fused block by block exactly as the live AudioHub would.
+    """
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"'{path}': only 16-bit PCM WAV is supported.")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels)
+    if rate != sample_rate:
+        pcm = StreamingResampler(rate, sample_rate).process(pcm)
+    if channels == 2 and beamformer is not None:
+        block = BEAM_BLOCK_LENGTH
+        pcm = np.concatenate([beamformer.process(pcm[i:i + block]) for i in range(0, len(pcm), block)])
+    elif channels > 1:
+        pcm = pcm.mean(axis=1).astype(np.int16)
+    return pcm
+
+
+class _ReplayReader:
+    """PvRecorder-shaped reader over a ReplayHub; see AudioHub's HubReader."""
+
+    def __init__(self, hub, frame_length: int):
+        self._hub = hub
+        self.frame_length = frame_length
+        self._position = None
+        self.overruns = 0
+
+    def start(self, backlog: int = 0):
+        self._position = max(0, self._hub.position - backlog)
+
+    def stop(self):
+        self._position = None
+
+    def delete(self):
+        self.stop()
+
+    def read(self) -> np.ndarray:
+        end = self._position + self.frame_length
+        if end > len(self._hub.audio):
+            raise EOFError("replay source exhausted")
+        frame = self._hub.audio[self._position:end]
+        self._position = end
+        self._hub.position = max(self._hub.position, end)
+        return frame
+
+
+class ReplayHub:
+    """
+    Drop-in AudioHub replacement that serves recorded audio instead of the mic.
+
+    Frames are handed out as fast as the consumers ask for them, with no pacing
+    to the sample clock, so WakeWordDetector and CobraDetector run their normal
+    scoring and segmentation code over hours of audio in minutes. `position` is
+    the furthest sample any reader has consumed and stands in for "now": a reader
+    started after a wake word picks up exactly where wake-word detection stopped,
+    as it would on the live hub. Reading past the end raises EOFError.
+    """
+
+    realtime = False  # consumers must not drop frames to "keep up"
+
+    def __init__(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE):
+        self.audio = np.ascontiguousarray(audio, dtype=np.int16)
+        self.sample_rate = sample_rate
+        self.position = 0
+        self._noise = NoiseFloorTracker(sample_rate)
+        self._noise_fed = 0
+
+    @classmethod
+    def from_wav(cls, path: str, beamformer=None) -> "ReplayHub":
+        return cls(load_wav(path, beamformer=beamformer))
+
+    @property
+    def position_s(self) -> float:
+        return self.position / self.sample_rate
+
+    @property
+    def noise_floor(self) -> float:
+        """As AudioHub.noise_floor: tracked over the audio up to `position`."""
+        block = 160
+        end = self.position - (self.position - self._noise_fed) % block
+        for start in range(self._noise_fed, end, block):
+            self._noise.update(self.audio[start:start + block])
+        self._noise_fed = end
+        return self._noise.floor
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    def subscribe(self, frame_length: int) -> _ReplayReader:
+        return _ReplayReader(self, frame_length)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+async def replay_file(hub: ReplayHub, wakeword, detector=None) -> list:
+    """
+    Run the wake-word -> utterance loop of main.py over one replay source.
+
+    Returns one event dict per detection: the wake word, the audio time it fired
+    at and, when a CobraDetector is given, the utterance it then captured.
+    """
+    wakeword.hub = hub
+    if detector is not None:
+        detector.hub = hub
+    events = []
+    try:
+        while True:
+            index, keyword = await wakeword.wait_for_wakeword()
+            event = {"keyword": keyword, "time_s": round(hub.position_s, 3)}
+            events.append(event)
+            if detector is not None:
+                pcm = await detector.wait_for_utterance()
+                end = hub.position_s
+                length = len(pcm) / 2 / hub.sample_rate
+                event["utterance"] = (
+                    {"start_s": round(end - length, 3), "end_s": round(end, 3), "length_s": round(length, 3)}
+                    if pcm else None
+                )
+    except EOFError:
+        pass
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay WAV files through the wake-word and VAD pipeline faster than real time.")
+    parser.add_argument('wavs', nargs='+', help='WAV files or directories of WAV files')
+    parser.add_argument('--model_paths', nargs='+', default=sorted(glob.glob('models/*.tflite')),
+                        help='openWakeWord .tflite models (default: models/*.tflite)')
+    parser.add_argument('--threshold', type=float, default=0.6)
+    parser.add_argument('--thresholds', nargs='*', default=[], metavar='KEYWORD=VALUE',
+                        help='Per-keyword overrides, e.g. hey-octo=0.5 knight-rider=0.45')
+    parser.add_argument('--trigger_frames', type=int, default=1)
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Noise-relative thresholds (wakeword.AdaptiveThresholds); learned per file')
+    parser.add_argument('--smoothing', nargs='+', default=['none'], metavar='[KEYWORD=]MODE',
+                        help='Score smoothing before the threshold comparison (none, ema, peak) for every '
+                             'keyword or per keyword, e.g. knight-rider=peak hey-octo=ema')
+    parser.add_argument('--vad_backend', choices=VAD_BACKENDS, default='webrtc',
+                        help='Utterance VAD engine (compare them with tests/vad_backend_benchmark.py)')
+    parser.add_argument('--vad_model', help='Model file for --vad_backend neural')
+    parser.add_argument('--endpointing', choices=ENDPOINTING_MODES, default='fixed',
+                        help='End-of-utterance rule (compare them with tests/endpointing_benchmark.py)')
+    parser.add_argument('--no_vad', action='store_true', help='Only score wake words, skip utterance capture')
+    parser.add_argument('--beamform', action='store_true',
+                        help='Fuse 2-channel recordings with the delay-and-sum beamformer instead of averaging')
+    parser.add_argument('--json', help='Write all events to this JSON file')
+    args = parser.parse_args()
+
+    from wakeword import WakeWordDetector, AdaptiveThresholds
+    from cobravoice import CobraDetector
+    from endpointing import make_endpointer
+    from beamform import DelayAndSumBeamformer
+
+    paths = []
+    for p in args.wavs:
+        paths.extend(sorted(glob.glob(os.path.join(p, '**', '*.wav'), recursive=True)) if os.path.isdir(p) else [p])
+    if not paths:
+        print("No WAV files to replay.")
+        sys.exit(1)
+
+    thresholds = {k: float(v) for k, v in (t.split('=', 1) for t in args.thresholds)}
+    smoothing = dict(t.split('=', 1) for t in args.smoothing) if '=' in args.smoothing[0] else args.smoothing[0]
+    try:
+        AdaptiveThresholds(smoothing=smoothing)
+    except ValueError as e:
+        parser.error(f"--smoothing: {e}")
+    wakeword = WakeWordDetector(model_paths=args.model_paths, threshold=args.threshold,
+                                thresholds=thresholds, trigger_frames=args.trigger_frames)
+    detector = None if args.no_vad else CobraDetector(vad_backend=args.vad_backend, vad_model=args.vad_model,
+                                                      endpointer=make_endpointer(args.endpointing))
+
+    results = {}
+    total_audio = 0.0
+    started = time.perf_counter()
+    for path in paths:
+        if args.adaptive or smoothing != 'none':
+            wakeword.adaptive = AdaptiveThresholds(smoothing=smoothing)
+        hub = ReplayHub.from_wav(path, beamformer=DelayAndSumBeamformer() if args.beamform else None)
+        t0 = time.perf_counter()
+        events = asyncio.run(replay_file(hub, wakeword, detector))
+        elapsed = time.perf_counter() - t0
+        total_audio += hub.duration_s
+        results[path] = events
+        print(f"{path}: {hub.duration_s:.1f}s audio in {elapsed:.1f}s "
+              f"({hub.duration_s / max(elapsed, 1e-9):.1f}x real time), {len(events)} detection(s)")
+        for e in events:
+            utt = e.get("utterance")
+            extra = f", utterance {utt['start_s']:.2f}-{utt['end_s']:.2f}s" if utt else ""
+            print(f"  {e['time_s']:8.2f}s  {e['keyword']}{extra}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Total: {total_audio / 60:.1f} min of audio in {elapsed:.1f}s "
+          f"({total_audio / max(elapsed, 1e-9):.1f}x real time)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
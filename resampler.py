@@ -0,0 +1,89 @@
+from math import gcd
+
+import numpy as np
+from scipy import signal
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase FIR resampler for block-wise audio streams.
+
+    The rate ratio is reduced to up/down = L/M and filtered with one low-pass
+    prototype of `L * taps_per_phase` taps through scipy's polyphase `upfirdn`,
+    so every output sample costs a `taps_per_phase`-tap dot product. The last
+    `taps_per_phase - 1` input samples and the output phase are carried into
+    the next call, so consecutive blocks resample exactly as one continuous
+    signal would: no edge artifacts at block boundaries, and the cost per block
+    is linear in its length (no per-block FFT).
+
+    Input may be 1-D (mono) or 2-D (frames, channels); output has the same layout
+    and dtype. Total output length tracks `n_in * out_rate / in_rate` across calls.
+
+    Usage:
+        rs = StreamingResampler(48000, 16000)
+        out = rs.process(block)   # call once per captured block
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 24,
+                 cutoff: float = 0.9, kaiser_beta: float = 8.0):
+        if in_rate <= 0 or out_rate <= 0:
+            raise ValueError("Sample rates must be positive.")
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+        self.taps_per_phase = taps_per_phase
+
+        if self.up == self.down:
+            self._h_padded = None
+            return
+
+        # Prototype low-pass at the upsampled rate; cutoff below the narrower of
+        # the two Nyquists (fraction `cutoff` of it), gain `up` to undo zero-stuffing.
+        num_taps = self.up * taps_per_phase
+        h = signal.firwin(num_taps, cutoff / max(self.up, self.down),
+                          window=("kaiser", kaiser_beta)) * self.up
+        # upfirdn always starts at output phase 0; delaying the filter by s zeros
+        # shifts its grid by s upsampled samples. A `down`-zero prefix lets every
+        # delay in [0, down) be taken as a view instead of a new array per call.
+        self._h_padded = np.concatenate((np.zeros(self.down), h)).astype(np.float32)
+        self._history = None
+        # Position of the next output in upsampled units, relative to the first
+        # sample of the carried history. Starting at the end of the (zero) history
+        # aligns output 0 with input 0.
+        self._next = (taps_per_phase - 1) * self.up
+
+    def reset(self):
+        if self._h_padded is not None:
+            self._history = None
+            self._next = (self.taps_per_phase - 1) * self.up
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block)
+        if self._h_padded is None or len(block) == 0:
+            return block.copy()
+
+        k = self.taps_per_phase
+        x = block.astype(np.float32)
+        if self._history is None:
+            self._history = np.zeros((k - 1,) + x.shape[1:], dtype=np.float32)
+        x = np.concatenate((self._history, x))
+
+        # Outputs sit at upsampled positions _next + j * down; emit every one
+        # whose newest input sample is already in x.
+        limit = len(x) * self.up
+        count = max(0, -(-(limit - self._next) // self.down))
+        first = -(-self._next // self.down)           # upfirdn index of output 0
+        delay = first * self.down - self._next        # in [0, down)
+        h = self._h_padded[self.down - delay:]
+        y = signal.upfirdn(h, x, self.up, self.down, axis=0)[first:first + count]
+
+        keep = len(x) - (k - 1)
+        self._history = x[keep:]
+        self._next += self.down * count - keep * self.up
+
+        if np.issubdtype(block.dtype, np.integer):
+            info = np.iinfo(block.dtype)
+            y = np.clip(np.rint(y), info.min, info.max)
+        return y.astype(block.dtype)
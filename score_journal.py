@@ -0,0 +1,273 @@
+import os
+import glob
+import json
+import time
+import wave
+import queue
+import struct
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from pcm_ring import PcmRingBuffer
+
+SAMPLE_RATE = 16000
+FRAME_S = 0.08  # one record per openWakeWord frame
+
+MAGIC = b"WWSJ"
+VERSION = 1
+# magic, version, n_keys, capacity (records), record size, header size, records ever written
+_HEADER = struct.Struct("<4sHHIIIQ")
+
+log = logging.getLogger(__name__)
+
+
+def record_dtype(n_keys: int) -> np.dtype:
+    """One journal record: wall-clock time, index+1 of the keyword that fired (0 = none), scores."""
+    return np.dtype([("t", "<f8"), ("fired", "u1"), ("scores", "<f2", (n_keys,))])
+
+
+class ScoreJournal:
+    """
+    Always-on flight recorder of wake-word scores, for misses and false accepts.
+
+    Every frame becomes a fixed-size record (timestamp, float16 score per
+    model key) in a preallocated ring file of `capacity_s` seconds: the header
+    holds the key names and the total number of records written, so the file
+    never grows and the oldest records are overwritten in place. Records are
+    collected in memory and handed to a writer thread `flush_records` at a time
+    (20 s by default), so the inference thread never touches the SD card and the
+    card sees one small write every few seconds.
+
+    The last `pcm_seconds` of raw audio are kept in a PCM ring; on every trigger
+    they are written to `dump_dir` as a WAV (the audio leading up to and
+    including the trigger frame), and the oldest dumps beyond `max_dumps` are
+    deleted. `dump_audio()` does the same on demand, e.g. right after a miss.
+
+    When the detector's model set changes, open() starts a fresh file and keeps
+    the previous one as `<path>.prev`.
+
+    Usage:
+        journal = ScoreJournal("logs/wakeword_scores.bin")
+        detector = WakeWordDetector(model_paths, journal=journal)
+        keys, records = read_journal("logs/wakeword_scores.bin")
+    """
+
+    def __init__(
+        self,
+        path: str,
+        capacity_s: float = 24 * 3600.0,
+        flush_records: int = 250,
+        pcm_seconds: float = 10.0,
+        dump_dir: str = None,
+        max_dumps: int = 50,
+    ):
+        self.path = path
+        self.capacity = max(1, int(capacity_s / FRAME_S))
+        self.flush_records = max(1, flush_records)
+        self.dump_dir = dump_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "wakeword_triggers")
+        self.max_dumps = max_dumps
+        self.keys = None
+        self.audio = PcmRingBuffer(int(pcm_seconds * SAMPLE_RATE))
+        self._batch = None
+        self._count = 0
+        self._writes = queue.Queue(maxsize=16)
+        self._writer = None
+
+    def open(self, keys):
+        """Start journaling `keys`; reuses a compatible existing file. Cheap when unchanged."""
+        keys = list(keys)
+        if keys == self.keys:
+            return
+        self.flush()
+        self._writes.join()
+        self.keys = keys
+        self._dtype = record_dtype(len(keys))
+        self._batch = np.zeros(self.flush_records, dtype=self._dtype)
+        self._count = 0
+        self._enqueue(("open", keys))
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="score-journal", daemon=True)
+            self._writer.start()
+
+    def add_audio(self, frame: np.ndarray):
+        self.audio.write(frame)
+
+    def append(self, timestamp: float, scores, fired: int = 0):
+        """Buffer one record; `fired` is the index+1 of the keyword that triggered on it."""
+        if self._batch is None:
+            return
+        rec = self._batch[self._count]
+        rec["t"] = timestamp
+        rec["fired"] = fired
+        rec["scores"] = scores
+        self._count += 1
+        if self._count == self.flush_records:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered records to the writer thread."""
+        if self._count:
+            self._enqueue(("records", self._batch[:self._count].copy()))
+            self._count = 0
+
+    def trigger(self, keyword: str, timestamp: float):
+        """Mark a trigger: flush the scores and dump the buffered audio."""
+        self.flush()
+        self.dump_audio(keyword, timestamp)
+
+    def dump_audio(self, label: str = "manual", timestamp: float = None):
+        n = min(self.audio.written, self.audio.capacity)
+        if n == 0:
+            return
+        pcm = self.audio.view(self.audio.written - n, n).copy()
+        stamp = datetime.fromtimestamp(timestamp or time.time()).strftime("%Y%m%d-%H%M%S")
+        self._enqueue(("wav", os.path.join(self.dump_dir, f"{stamp}-{label}.wav"), pcm))
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writes.join()
+
+    def _enqueue(self, item):
+        try:
+            self._writes.put_nowait(item)
+        except queue.Full:
+            log.warning("Score journal writer is behind; dropped a %s batch.", item[0])
+
+    def _write_loop(self):
+        f = None
+        while True:
+            item = self._writes.get()
+            try:
+                if item[0] == "open":
+                    if f is not None:
+                        f.close()
+                    f = self._open_file(item[1])
+                elif item[0] == "records" and f is not None:
+                    self._write_records(f, item[1])
+                elif item[0] == "wav":
+                    self._write_wav(item[1], item[2])
+            except Exception as e:
+                # The writer must outlive any bad file: open() joins this queue.
+                log.error("Score journal write failed: %s", e)
+            finally:
+                self._writes.task_done()
+
+    def _open_file(self, keys):
+        dtype = record_dtype(len(keys))
+        header = read_header(self.path) if os.path.isfile(self.path) else None
+        if header is not None and header["keys"] == keys and header["capacity"] == self.capacity:
+            f = open(self.path, "r+b")
+            self._written, self._header_size = header["written"], header["header_size"]
+            return f
+        if os.path.isfile(self.path):
+            os.replace(self.path, self.path + ".prev")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        names = json.dumps(keys).encode()
+        self._header_size = -(-(_HEADER.size + len(names)) // 64) * 64
+        self._written = 0
+        f = open(self.path, "w+b")
+        f.write(_HEADER.pack(MAGIC, VERSION, len(keys), self.capacity, dtype.itemsize, self._header_size, 0))
+        f.write(names)
+        f.truncate(self._header_size + self.capacity * dtype.itemsize)  # sparse on ext4
+        f.flush()
+        return f
+
+    def _write_records(self, f, records):
+        size = records.dtype.itemsize
+        while len(records):
+            slot = self._written % self.capacity
+            n = min(len(records), self.capacity - slot)
+            f.seek(self._header_size + slot * size)
+            f.write(records[:n].tobytes())
+            self._written += n
+            records = records[n:]
+        # Publish the new count only after the records it covers are written.
+        f.seek(_HEADER.size - 8)
+        f.write(struct.pack("<Q", self._written))
+        f.flush()
+
+    def _write_wav(self, path, pcm):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(pcm.tobytes())
+        dumps = sorted(glob.glob(os.path.join(os.path.dirname(path), "*.wav")))
+        for old in dumps[:max(0, len(dumps) - self.max_dumps)]:
+            os.remove(old)
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, n_keys, capacity, record_size, header_size, written = _HEADER.unpack(raw)
+        if magic != MAGIC or version != VERSION:
+            return None
+        try:
+            keys = json.loads(f.read(header_size - _HEADER.size).rstrip(b"\0").decode())
+        except ValueError:
+            return None  # torn key list: the file is rotated to .prev like a foreign one
+    return {"keys": keys, "capacity": capacity, "record_size": record_size,
+            "header_size": header_size, "written": written}
+
+
+def read_journal(path: str):
+    """
+    Load a score journal as (keys, records), records in chronological order.
+
+    `records` is a structured array with fields "t" (unix time), "fired"
+    (index+1 into `keys` of the keyword that triggered, 0 otherwise) and
+    "scores" (n_records, n_keys) float16. Frames the silence gate kept away
+    from the model are recorded with all scores 0.
+    """
+    header = read_header(path)
+    if header is None:
+        raise ValueError(f"'{path}' is not a wake-word score journal.")
+    dtype = record_dtype(len(header["keys"]))
+    data = np.fromfile(path, dtype=dtype, count=header["capacity"], offset=header["header_size"])
+    written = header["written"]
+    if written <= header["capacity"]:
+        return header["keys"], data[:written]
+    slot = written % header["capacity"]
+    return header["keys"], np.concatenate((data[slot:], data[:slot]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a wake-word score journal.")
+    parser.add_argument('journal', help='Journal file written by ScoreJournal')
+    parser.add_argument('--since', help='Only records after this local time, e.g. "2026-10-18 19:30"')
+    parser.add_argument('--npz', help='Export times, fired flags and float32 scores to this .npz')
+    args = parser.parse_args()
+
+    keys, records = read_journal(args.journal)
+    if args.since:
+        records = records[records["t"] >= datetime.fromisoformat(args.since).timestamp()]
+    if len(records) == 0:
+        print("No records.")
+        return
+    t = records["t"]
+    scores = records["scores"].astype(np.float32)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    print(f"{len(records)} frames scored, {datetime.fromtimestamp(t[0]).strftime(fmt)} .. "
+          f"{datetime.fromtimestamp(t[-1]).strftime(fmt)}")
+    print(f"  {'keyword':<16} {'p50':>6} {'p99':>6} {'max':>6} {'triggers':>8}")
+    for i, key in enumerate(keys):
+        col = scores[:, i]
+        print(f"  {key:<16} {np.median(col):>6.3f} {np.percentile(col, 99):>6.3f} {col.max():>6.3f} "
+              f"{int((records['fired'] == i + 1).sum()):>8}")
+    for r in records[records["fired"] > 0]:
+        print(f"  {datetime.fromtimestamp(r['t']).strftime(fmt)}  {keys[r['fired'] - 1]}")
+    if args.npz:
+        np.savez_compressed(args.npz, keys=np.array(keys), t=t, fired=records["fired"], scores=scores)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import re
+
+# Closing punctuation (plus any closing quotes/brackets) followed by whitespace,
+# or a line break.
+_BOUNDARY = re.compile(r'([.!?…]+["\'”’)\]]*)\s+|\n\s*')
+_LAST_WORD = re.compile(r'(\w+)\.$')
+
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "vs", "etc", "eg", "ie", "approx"}
+# Abbreviations only before a number ("No. 5"); elsewhere they are ordinary words ("The answer is no.").
+NUMBER_ABBREVIATIONS = {"no", "nr"}
+
+
+class SentenceSplitter:
+    """
+    Cuts streamed LLM text into sentences as the tokens arrive.
+
+    feed() takes each delta and returns the sentences it completed. A sentence
+    only ends at punctuation that is followed by whitespace, so "3." + "5" or
+    "Mr." + " Smith" never split: the cut waits for the next token. Common
+    abbreviations and single-letter initials are not treated as ends ("No."
+    only before a number), and a sentence shorter than `min_chars` is joined
+    to the next one, so TTS never gets a lone "Oh." to render. flush() returns what is left when the stream
+    ends.
+
+    Usage:
+        splitter = SentenceSplitter()
+        for delta in deltas:
+            for sentence in splitter.feed(delta):
+                speak(sentence)
+        for sentence in splitter.flush():
+            speak(sentence)
+    """
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    @staticmethod
+    def _last_word(text: str) -> str:
+        m = _LAST_WORD.search(text)
+        return m.group(1) if m else ""
+
+    def _is_abbreviation(self, word: str, following: str) -> bool:
+        if word.lower() in NUMBER_ABBREVIATIONS:
+            return following[:1].isdigit()
+        return word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper())
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for m in _BOUNDARY.finditer(self._buffer):
+            end = m.end(1) if m.group(1) else m.start()
+            sentence = self._buffer[start:end].strip()
+            if m.group(1):
+                word = self._last_word(sentence)
+                following = self._buffer[m.end():]
+                if not following and word.lower() in NUMBER_ABBREVIATIONS:
+                    break  # "No." or "no.": a digit in the next token decides
+                if self._is_abbreviation(word, following) or len(sentence) < self.min_chars:
+                    continue
+            if sentence:
+                sentences.append(sentence)
+            start = m.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str, min_chars: int = 12) -> list[str]:
+    """Sentences of a complete text, cut by the same rules as the streaming splitter."""
+    splitter = SentenceSplitter(min_chars)
+    return splitter.feed(text) + splitter.flush()
@@ -2,20 +2,29 @@ import asyncio
 import os
 import wave
 import time
+import queue
+import threading
 import numpy as np
-import sounddevice as sd
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 import traceback
 
+from chat_gpt_client import make_async_client
+from playback import StreamPlayer, default_output_rate
+from resampler import StreamingResampler
+from sentence_splitter import split_sentences
+from tts_cache import TtsCache, cache_key, DEFAULT_MAX_MB
+
 load_dotenv()
 
 # === Constants ===
 _BASE_RATE   = 24_000       # TTS engine?s native sample rate
 SPEED        = 1.3          # playback speed multiplier
 DEFAULT_GAIN = 2.0
+TTS_MODEL    = "gpt-4o-mini-tts"
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Shared with OpenAIClient via set_client(), so TTS reuses the warm pooled
+# connections of STT and chat; created on first use otherwise.
+client = None
 STYLE = (
     "Tone: witty, dry sarcasm, cocky confidence.\n"
     "Emotion: amused contempt.\n"
@@ -25,88 +34,266 @@ STYLE = (
 def _ensure_dir():
     os.makedirs("responses", exist_ok=True)
 
-def _open_wav(ts: str):
-    wf = wave.open(f"responses/{ts}.wav", "wb")
+def _open_wav(path: str):
+    wf = wave.open(path, "wb")
     wf.setnchannels(2)
     wf.setsampwidth(2)             # 16-bit
     wf.setframerate(_BASE_RATE)    # files stay at true speed
     return wf
 
-async def _speak_chan(text: str, voice: str, left: bool, gain: float = DEFAULT_GAIN):
-    _ensure_dir()
-    ts = time.strftime("%Y%m%d-%H%M%S")
-    print(f"[{ts}] Rendering ? {text!r} ({voice})")
+def _stereo(pcm: np.ndarray, left: bool) -> np.ndarray:
+    silent = np.zeros_like(pcm)
+    return np.column_stack((pcm, silent) if left else (silent, pcm))
+
+class _WavArchive:
+    """Writes the true-speed response WAV on a background thread, off the playback path."""
+
+    def __init__(self, ts: str):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(ts,), daemon=True)
+        self._thread.start()
+
+    def _run(self, ts):
+        wf = None  # opened on the first audio: a reply served from the cache has nothing new to archive
+        try:
+            while (frames := self._queue.get()) is not None:
+                if wf is None:
+                    wf = _open_wav(f"responses/{ts}.wav")
+                wf.writeframes(frames.tobytes())
+        finally:
+            if wf is not None:
+                wf.close()
+                print(f"[{ts}] Saved WAV at true speed")
+
+    def write(self, frames: np.ndarray):
+        self._queue.put(frames)
+
+    def close(self):
+        self._queue.put(None)
+
+def set_client(shared):
+    global client
+    client = shared
+
+def _get_client():
+    global client
+    if client is None:
+        client = make_async_client(os.getenv("OPENAI_API_KEY"))
+    return client
+
+_player = None
+
+def _get_player() -> StreamPlayer:
+    """The shared output stream, opened on first use and kept for every later reply."""
+    global _player
+    if _player is None:
+        _player = StreamPlayer()
+    return _player
+
+def output_rate() -> int:
+    return _player.sample_rate if _player is not None else default_output_rate()
+
+_cache = None
+_cache_mb = DEFAULT_MAX_MB
+
+def configure_cache(max_mb: int = DEFAULT_MAX_MB):
+    """Size budget of the sentence cache in MB; 0 disables it."""
+    global _cache, _cache_mb
+    _cache, _cache_mb = None, max_mb
+
+def get_cache():
+    global _cache
+    if _cache is None and _cache_mb > 0:
+        _cache = TtsCache(max_bytes=_cache_mb * 1024 * 1024)
+    return _cache
+
+def _key(text: str, voice: str, gain: float, rate: int) -> str:
+    return cache_key(text, voice, STYLE, TTS_MODEL, gain, SPEED, rate)
+
+class _Renderer:
+    """
+    Turns one sentence's TTS byte stream into PCM: gain at true speed (for the
+    archive) and the playback version. Playing 24 kHz audio as if it were
+    SPEED x 24 kHz is the speed-up; one streaming resampler does that and the
+    conversion to the hardware rate.
+    """
+
+    def __init__(self, gain: float, play_rate: int):
+        self.gain = gain
+        self.resampler = StreamingResampler(int(_BASE_RATE * SPEED), play_rate)
+        self.played = []
+        self._carry = b""
 
-    # 1) Fetch *all* PCM bytes
-    buf = bytearray()
+    def feed(self, chunk: bytes):
+        data = self._carry + chunk
+        whole = len(data) - len(data) % 2  # chunks may split a sample
+        self._carry = data[whole:]
+        pcm = np.frombuffer(data[:whole], dtype=np.int16).astype(np.int32)
+        pcm = np.clip(pcm * self.gain, -32768, 32767).astype(np.int16)
+        played = self.resampler.process(pcm)
+        self.played.append(played)
+        return pcm, played
+
+    def result(self) -> np.ndarray:
+        return np.concatenate(self.played) if self.played else np.zeros(0, dtype=np.int16)
+
+async def _fetch(text: str, voice: str, chunks: asyncio.Queue, ts: str) -> bool:
+    """Stream one sentence's PCM into `chunks`; None marks its end (also after a failure)."""
     try:
-        async with client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
+        async with _get_client().audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
             voice=voice,
             instructions=STYLE,
             input=text,
             response_format="pcm"
         ) as resp:
             async for chunk in resp.iter_bytes():
-                buf.extend(chunk)
+                await chunks.put(chunk)
+        return True
     except Exception:
-        print(f"[{ts}] TTS fetch failed!")
+        print(f"[{ts}] TTS fetch failed for {text!r}!")
         traceback.print_exc()
-        return
-
-    # 2) Decode & apply gain
-    pcm = (
-        np.frombuffer(buf, dtype=np.int16)
-          .astype(np.int32)
-    )
-    pcm = np.clip(pcm * gain, -32768, 32767).astype(np.int16)
-
-    # 3) Build stereo True-speed file data
-    stereo_file = (
-        np.column_stack((pcm, np.zeros_like(pcm))) if left
-        else np.column_stack((np.zeros_like(pcm), pcm))
-    )
-
-    # 4) Write it out immediately
-    wf = _open_wav(ts)
-    wf.writeframes(stereo_file.tobytes())
-    wf.close()
-    print(f"[{ts}] Saved WAV at true speed")
-
-    # 5) Speed & resample for playback
-    dev = sd.query_devices(kind='output')
-    play_rate = int(dev['default_samplerate'])
-    orig_len = pcm.shape[0]
-    # first compress time by SPEED
-    compressed_len = int(orig_len / SPEED)
-    if compressed_len < 1:
-        print(f"[{ts}] Audio too short to speed up.")
-        return
-
-    compressed = np.interp(
-        np.linspace(0, orig_len, compressed_len, endpoint=False),
-        np.arange(orig_len),
-        pcm
-    ).astype(np.int16)
-
-    # then resample to hardware rate
-    final_len = int(compressed_len * (play_rate / _BASE_RATE))
-    played = np.interp(
-        np.linspace(0, compressed_len, final_len, endpoint=False),
-        np.arange(compressed_len),
-        compressed
-    ).astype(np.int16)
-
-    # stereo for playback
-    stereo_play = (
-        np.column_stack((played, np.zeros_like(played))) if left
-        else np.column_stack((np.zeros_like(played), played))
-    )
-
-    # 6) Fire-and-forget playback (PortAudio pulls from our array)
-    print(f"[{ts}] Playing back at {play_rate} Hz, {SPEED}� speed")
-    sd.play(stereo_play, samplerate=play_rate, blocking=True)
+        return False
+    finally:
+        await chunks.put(None)
+
+async def render(text: str, voice: str, gain: float = DEFAULT_GAIN, play_rate: int = None):
+    """
+    Fetch one sentence and store its playback PCM in the cache (a cache warmer's
+    unit of work). Returns the true-speed PCM with gain applied, or None when
+    the request failed.
+    """
+    play_rate = play_rate or output_rate()
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    chunks = asyncio.Queue()
+    if not await _fetch(text, voice, chunks, ts):
+        return None
+    renderer = _Renderer(gain, play_rate)
+    true_speed = []
+    while (chunk := chunks.get_nowait()) is not None:
+        true_speed.append(renderer.feed(chunk)[0])
+    cache = get_cache()
+    if cache is not None:
+        cache.put(_key(text, voice, gain, play_rate), renderer.result())
+    return np.concatenate(true_speed) if true_speed else np.zeros(0, dtype=np.int16)
+
+async def warm(lines: dict, prefix: str, play_rate: int = None):
+    """
+    Cache warmer behind the pre_render_* scripts. Renders every line of `lines`
+    ({role: {desc: text}}, role "ash" or "coral") into the TTS cache sentence by
+    sentence, the unit speak.py looks up, and writes the true-speed WAV that
+    intro_player.py plays to audio/tts/<role>/<role>_<prefix>_<desc>.wav, with
+    only the role's channel active (left for ash, right for coral).
+    """
+    play_rate = play_rate or output_rate()
+
+    async def one(role: str, desc: str, text: str):
+        voice = "ash" if role == "ash" else "coral"
+        path = f"audio/tts/{role}/{role}_{prefix}_{desc}.wav"
+        parts = await asyncio.gather(*(render(sentence, voice, play_rate=play_rate)
+                                       for sentence in split_sentences(text)))
+        if not parts or any(part is None for part in parts):
+            print(f"Failed to fetch TTS for {role}/{desc}")
+            return
+        wf = _open_wav(path)
+        wf.writeframes(_stereo(np.concatenate(parts), left=role == "ash").tobytes())
+        wf.close()
+        print(f"Saved {path}")
+
+    for role in lines:
+        os.makedirs(f"audio/tts/{role}", exist_ok=True)
+    await asyncio.gather(*(one(role, desc, text) for role, phrases in lines.items()
+                           for desc, text in phrases.items()))
+    cache = get_cache()
+    if cache is not None:
+        print(f"TTS cache: {len(cache)} entries, {cache.size_bytes / 1e6:.1f} MB")
+
+async def _speak_sentences(sentences, voice: str, left: bool, gain: float = DEFAULT_GAIN, prefetch: int = 2):
+    """
+    Speak an async iterable of sentences as one gapless reply.
+
+    Every sentence gets its own TTS request as soon as it arrives (up to
+    `prefetch` ahead of the one playing), while playback consumes them strictly
+    in order through the shared player, so the next sentence is usually
+    synthesized before the current one has finished playing. Sentences found in
+    the cache skip the request and play at once; fresh ones are added to it.
+    """
+    _ensure_dir()
+    ts = time.strftime("%Y%m%d-%H%M%S")
+
+    player = _get_player()
+    cache = get_cache()
+    loop = asyncio.get_running_loop()
+    archive = _WavArchive(ts)
+    pending = asyncio.Queue(maxsize=prefetch)
+    # One slot per TTS request: the sentence playing plus `prefetch` ahead of it.
+    # Taken before the request starts, given back once the sentence has played.
+    requests = asyncio.Semaphore(prefetch + 1)
+    started = time.monotonic()
+
+    async def request_all():
+        fetches = []
+        try:
+            async for text in sentences:
+                key = _key(text, voice, gain, player.sample_rate)
+                cached = cache.get(key) if cache is not None else None
+                if cached is not None:
+                    print(f"[{ts}] Cached ? {text!r} ({voice})")
+                    await pending.put((key, cached))
+                    continue
+                print(f"[{ts}] Rendering ? {text!r} ({voice})")
+                await requests.acquire()
+                chunks = asyncio.Queue()
+                fetches.append(asyncio.create_task(_fetch(text, voice, chunks, ts)))
+                await pending.put((key, (chunks, fetches[-1])))
+        except asyncio.CancelledError:
+            for fetch in fetches:
+                fetch.cancel()
+            raise
+        except Exception:
+            await pending.put(None)
+            raise
+        await pending.put(None)
+
+    # Each chunk is played as soon as it arrives; the jitter buffer in the
+    # player absorbs the unevenness of the downloads.
+    player.begin()
+    requester = asyncio.create_task(request_all())
+    try:
+        while (item := await pending.get()) is not None:
+            key, source = item
+            if isinstance(source, np.ndarray):
+                player.write(_stereo(source, left))
+                continue
+            chunks, fetch = source
+            renderer = _Renderer(gain, player.sample_rate)
+            while (chunk := await chunks.get()) is not None:
+                pcm, played = renderer.feed(chunk)
+                archive.write(_stereo(pcm, left))
+                player.write(_stereo(played, left))
+            requests.release()
+            if cache is not None and await fetch:
+                loop.run_in_executor(None, cache.put, key, renderer.result())
+    finally:
+        player.end()
+        archive.close()
+        if not requester.done():
+            requester.cancel()
+
+    await player.drain()
+    if player.first_audio is not None:
+        print(f"[{ts}] First audio after {player.first_audio - started:.2f}s "
+              f"({player.sample_rate} Hz, {SPEED}x speed)")
     print(f"[{ts}] Done.")
+    await requester  # re-raises a failure of the sentence source (e.g. the chat stream)
+
+async def _speak_chan(text: str, voice: str, left: bool, gain: float = DEFAULT_GAIN):
+    # Per sentence, like a streamed reply: the cache works in sentences, and a
+    # long text starts playing after its first one.
+    async def each():
+        for sentence in split_sentences(text):
+            yield sentence
+    await _speak_sentences(each(), voice, left, gain)
 
 async def speak_female(text: str):
     await _speak_chan(text, voice="coral", left=False)
@@ -114,6 +301,13 @@ async def speak_female(text: str):
 async def speak_male(text: str):
     await _speak_chan(text, voice="ash", left=True)
 
+async def speak_female_stream(sentences):
+    """Speak sentences (async iterable) as they arrive, e.g. from a streamed chat reply."""
+    await _speak_sentences(sentences, voice="coral", left=False)
+
+async def speak_male_stream(sentences):
+    await _speak_sentences(sentences, voice="ash", left=True)
+
 if __name__ == "__main__":
     asyncio.run(speak_female("Hey, what's up, octo-honey?"))
     asyncio.run(speak_male("Leave me alone, you octo-pinky-winky-dinky!"))
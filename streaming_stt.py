@@ -0,0 +1,126 @@
+import math
+import time
+import asyncio
+import logging
+
+import numpy as np
+
+from audio_encode import encode_pcm
+
+log = logging.getLogger(__name__)
+
+
+class SegmentedTranscriber:
+    """
+    Speech-to-text that runs while the user is still talking.
+
+    Used as the `sink` of `CobraDetector.wait_for_utterance`: the utterance
+    arrives chunk by chunk and is cut into segments at pauses (a run of at least
+    `min_pause_s` frames much quieter than the segment's speech, once the segment
+    is `min_segment_s` long). Every closed segment is encoded and sent to
+    `transcribe` right away, so earlier segments are already transcribed
+    while later ones are still spoken. finish() closes the last segment,
+    waits for all requests and stitches the texts in order; after
+    end-of-speech only the final segment (usually a second or two) is still in
+    flight, instead of the whole utterance.
+
+    A short command has no pause long enough to cut at and is sent as a single
+    request, exactly as before. Segments are transcribed without each other's
+    context, so a cut can occasionally change a word at the boundary; cuts are
+    only made in silence to keep that rare.
+
+    `transcribe` is a coroutine function that takes a (filename, bytes) upload
+    and returns text, e.g. OpenAIClient.transcribe_audio; its requests run as
+    tasks on the event loop that feeds write() (CobraDetector's), sharing the
+    client's connection pool.
+
+    Usage:
+        stt = SegmentedTranscriber(client.transcribe_audio)
+        pcm = await detector.wait_for_utterance(sink=stt)
+        text = await stt.finish()
+    """
+
+    def __init__(self, transcribe, sample_rate: int = 16000, fmt: str = "flac",
+                 min_segment_s: float = 2.0, min_pause_s: float = 0.25, silence_ratio: float = 0.15,
+                 max_in_flight: int = 3):
+        self.transcribe = transcribe
+        self.sample_rate = sample_rate
+        self.fmt = fmt
+        self.frame_length = sample_rate * 30 // 1000
+        self.min_segment = int(min_segment_s * sample_rate)
+        self.min_pause_frames = max(1, round(min_pause_s * sample_rate / self.frame_length))
+        self.silence_ratio = silence_ratio
+        self._slots = None  # asyncio.Semaphore, created on the loop that calls write()
+        self._max_in_flight = max_in_flight
+        self._tasks = []
+        self._chunks = []
+        self._segment_samples = 0
+        self._pending = np.zeros(0, dtype=np.int16)  # tail shorter than one frame
+        self._speech_rms = []
+        self._quiet_run = 0
+        self._voiced = 0  # non-quiet frames in the current segment
+        self.segments = 0
+
+    def write(self, pcm):
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        samples = np.concatenate((self._pending, samples)) if len(self._pending) else np.asarray(samples)
+        n = self.frame_length
+        whole = len(samples) - len(samples) % n
+        # Copy: CobraDetector hands out views of its capture buffer.
+        self._pending = samples[whole:].copy()
+        for start in range(0, whole, n):
+            frame = samples[start:start + n]
+            self._chunks.append(frame.copy())
+            self._segment_samples += n
+            if self._pause(frame) and self._segment_samples >= self.min_segment:
+                self._submit()
+
+    def _pause(self, frame) -> bool:
+        x = frame.astype(np.float64)
+        rms = math.sqrt(np.dot(x, x) / len(x))
+        loud = np.percentile(self._speech_rms, 90) if self._speech_rms else 0.0
+        if rms < self.silence_ratio * loud:
+            self._quiet_run += 1
+        else:
+            self._quiet_run = 0
+            self._voiced += 1
+            self._speech_rms.append(rms)
+        return self._quiet_run >= self.min_pause_frames
+
+    def _submit(self):
+        if not self._chunks:
+            return
+        pcm = np.concatenate(self._chunks)
+        self._chunks = []
+        self._segment_samples = 0
+        self._quiet_run = 0
+        self._voiced = 0
+        self.segments += 1
+        index = self.segments
+        log.debug("STT segment %d: %.2fs", index, len(pcm) / self.sample_rate)
+
+        async def job():
+            async with self._slots:
+                started = time.monotonic()
+                text = await self.transcribe(encode_pcm(pcm, self.sample_rate, self.fmt))
+                log.debug("STT segment %d transcribed in %.2fs", index, time.monotonic() - started)
+                return text
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_in_flight)
+        self._tasks.append(asyncio.get_running_loop().create_task(job()))
+
+    async def finish(self) -> str:
+        """Send the last segment, wait for every request, return the joined transcript."""
+        if len(self._pending):
+            self._chunks.append(self._pending)
+            self._pending = np.zeros(0, dtype=np.int16)
+        if self._voiced or not self.segments:
+            self._submit()  # a trailing segment of pure silence only invites hallucinated text
+        try:
+            texts = await asyncio.gather(*self._tasks)
+        except BaseException:
+            for task in self._tasks:
+                task.cancel()
+            raise
+        return " ".join(str(t).strip() for t in texts if t and str(t).strip())
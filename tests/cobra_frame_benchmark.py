@@ -0,0 +1,72 @@
+import os
+import sys
+import math
+import time
+import struct
+import argparse
+
+import numpy as np
+import webrtcvad
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from cobravoice import _rms, _UtteranceBuffer
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 480  # CobraDetector's 30 ms frames
+
+
+def old_frame_path(frames, vad):
+    """The old CobraDetector loop: int lists, struct.pack, Python RMS, list of bytes + join."""
+    out = []
+    for frame in frames:
+        raw = struct.pack("h" * len(frame), *frame)
+        speech = vad.is_speech(raw, SAMPLE_RATE)
+        speech = speech and math.sqrt(sum(s * s for s in frame) / len(frame)) >= 200.0
+        out.append(raw)
+    return b"".join(out)
+
+
+def new_frame_path(frames, vad):
+    """CobraDetector now: each frame copied once into the utterance buffer and used from there."""
+    buffer = _UtteranceBuffer(FRAME_LENGTH, preroll_frames=10)
+    buffer.start()
+    for frame in frames:
+        slot = buffer.slot()
+        slot[:] = frame
+        buffer.commit()
+        speech = vad.is_speech(slot.view(np.uint8).data, SAMPLE_RATE)
+        speech = speech and _rms(slot) >= 200.0
+    return buffer.pcm().tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost of CobraDetector's utterance loop, before and after.")
+    parser.add_argument('--seconds', type=float, default=15.0, help='Utterance length (max_utterance_s)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    vad = webrtcvad.Vad(2)
+
+    rng = np.random.default_rng(0)
+    n_frames = int(args.seconds * SAMPLE_RATE / FRAME_LENGTH)
+    audio = rng.normal(0, 2000, n_frames * FRAME_LENGTH).astype(np.int16)
+    # PvRecorder hands out int lists, AudioHub readers int16 arrays.
+    list_frames = [audio[i * FRAME_LENGTH:(i + 1) * FRAME_LENGTH].tolist() for i in range(n_frames)]
+    array_frames = [audio[i * FRAME_LENGTH:(i + 1) * FRAME_LENGTH] for i in range(n_frames)]
+
+    print(f"{n_frames} frames of {FRAME_LENGTH} samples ({args.seconds:.0f}s utterance)")
+    results = {}
+    for name, fn, frames in (("old", old_frame_path, list_frames), ("new", new_frame_path, array_frames)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.process_time()
+            results[name] = fn(frames, vad)
+            best = min(best, time.process_time() - start)
+        print(f"  {name:<4} {1e6 * best / n_frames:8.1f} us CPU per frame")
+    assert results["old"] == results["new"], "paths disagree on the captured PCM"
+
+
+if __name__ == '__main__':
+    main()
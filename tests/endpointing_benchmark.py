@@ -0,0 +1,82 @@
+import os
+import sys
+import glob
+import asyncio
+import argparse
+
+import numpy as np
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from cobravoice import CobraDetector
+from endpointing import ENDPOINTING_MODES, make_endpointer
+from replay import ReplayHub
+
+
+async def segment(hub, detector, silence_timeout):
+    """Every utterance CobraDetector captures from a replay, as (start_s, end_s)."""
+    turns = []
+    try:
+        while True:
+            pcm = await detector.wait_for_utterance(silence_timeout=silence_timeout)
+            if pcm:
+                end = hub.position_s
+                turns.append((end - len(pcm) / 2 / hub.sample_rate, end))
+    except EOFError:
+        pass
+    return turns
+
+
+def compare(fixed, other):
+    """
+    Pair each fixed-timeout turn with the turns the other rule cut from the same
+    audio. Returns (end-time savings in seconds for turns kept whole, number of
+    fixed turns the other rule split into several).
+    """
+    savings, splits = [], 0
+    for start, end in fixed:
+        inside = [t for t in other if start - 0.05 <= t[0] < end]
+        if len(inside) == 1:
+            savings.append(end - inside[0][1])
+        elif len(inside) > 1:
+            splits += 1
+    return savings, splits
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay recordings through CobraDetector and compare end-of-utterance rules per turn.")
+    parser.add_argument('wavs', nargs='+', help='WAV files or directories of WAV files')
+    parser.add_argument('--modes', nargs='+', choices=ENDPOINTING_MODES[1:], default=['adaptive', 'prosody'])
+    parser.add_argument('--silence_timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    paths = []
+    for p in args.wavs:
+        paths.extend(sorted(glob.glob(os.path.join(p, '**', '*.wav'), recursive=True)) if os.path.isdir(p) else [p])
+
+    results = {mode: ([], 0) for mode in args.modes}
+    turns_total = 0
+    for path in paths:
+        hub = ReplayHub.from_wav(path)
+        fixed = asyncio.run(segment(hub, CobraDetector(hub=hub), args.silence_timeout))
+        turns_total += len(fixed)
+        for mode in args.modes:
+            hub = ReplayHub.from_wav(path)
+            detector = CobraDetector(hub=hub, endpointer=make_endpointer(mode))
+            savings, splits = compare(fixed, asyncio.run(segment(hub, detector, args.silence_timeout)))
+            results[mode][0].extend(savings)
+            results[mode] = (results[mode][0], results[mode][1] + splits)
+
+    print(f"{len(paths)} file(s), {turns_total} turns with the fixed {args.silence_timeout:.1f}s timeout")
+    print(f"  {'mode':<9} {'kept':>5} {'saved p50':>10} {'saved mean':>11} {'split':>6}")
+    for mode, (savings, splits) in results.items():
+        s = np.array(savings) * 1000
+        p50 = f"{np.median(s):.0f}ms" if len(s) else "-"
+        mean = f"{s.mean():.0f}ms" if len(s) else "-"
+        print(f"  {mode:<9} {len(s):>5} {p50:>10} {mean:>11} {splits:>6}")
+
+
+if __name__ == '__main__':
+    main()
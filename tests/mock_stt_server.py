@@ -0,0 +1,171 @@
+import io
+import os
+import json
+import asyncio
+import sys
+import time
+import wave
+import argparse
+import threading
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from audio_encode import StreamingEncoder
+from replay import load_wav
+from streaming_stt import SegmentedTranscriber
+
+SAMPLE_RATE = 16000
+CHUNK = 480  # CobraDetector hands the sink 30 ms frames
+
+
+def audio_seconds(name, data):
+    """Duration of an uploaded file; FLAC/Ogg need soundfile, otherwise estimated from the size."""
+    try:
+        if name.endswith(".wav"):
+            with wave.open(io.BytesIO(data)) as wf:
+                return wf.getnframes() / wf.getframerate()
+        import soundfile
+        return soundfile.info(io.BytesIO(data)).duration
+    except Exception:
+        return len(data) / (SAMPLE_RATE * 2)
+
+
+class MockSttHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST .../audio/transcriptions like the OpenAI API does with
+    response_format="text" (and GET .../models/<id>), after a delay of `base_s + per_audio_s * seconds`
+    that mimics a real transcription backend. The text names the request and
+    the audio length, so stitching order is visible in the result.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API, so connection reuse shows
+    base_s = 0.4
+    per_audio_s = 0.15
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        # models.retrieve(), which OpenAIClient.warm_up() uses to open a connection
+        if "/models/" not in self.path:
+            self.send_error(404)
+            return
+        body = json.dumps({"id": self.path.rsplit("/", 1)[-1], "object": "model",
+                           "created": 0, "owned_by": "mock"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.endswith("/audio/transcriptions"):
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = BytesParser(policy=policy.default).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+        upload = next((p for p in message.iter_parts() if p.get_param("name", header="content-disposition") == "file"), None)
+        if upload is None:
+            self.send_error(400, "no file part")
+            return
+        seconds = audio_seconds(upload.get_filename() or "", upload.get_content())
+        with MockSttHandler.lock:
+            MockSttHandler.requests += 1
+            n = MockSttHandler.requests
+        time.sleep(self.base_s + self.per_audio_s * seconds)
+        text = f"<request {n}: {seconds:.2f}s of {upload.get_filename()}>\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockSttHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def speak_into(sink, pcm, speed):
+    """Feed `pcm` to a sink in 30 ms chunks at `speed` x real time, like a live capture."""
+    start = time.monotonic()
+    for i in range(0, len(pcm), CHUNK):
+        sink.write(pcm[i:i + CHUNK])
+        delay = start + (i + CHUNK) / SAMPLE_RATE / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def compare(client, recordings, speed):
+    print(f"{'recording':<40} {'length':>7} {'single':>8} {'segmented':>10} {'segments':>9}")
+    for name, pcm in recordings:
+        encoder = StreamingEncoder(SAMPLE_RATE)
+        await speak_into(encoder, pcm, speed)
+        t0 = time.monotonic()
+        await client.transcribe_audio(encoder.finish())
+        single = time.monotonic() - t0
+
+        stt = SegmentedTranscriber(client.transcribe_audio, SAMPLE_RATE)
+        await speak_into(stt, pcm, speed)
+        t0 = time.monotonic()
+        text = await stt.finish()
+        segmented = time.monotonic() - t0
+        print(f"{os.path.basename(name):<40} {len(pcm) / SAMPLE_RATE:>6.1f}s {1000 * single:>6.0f}ms "
+              f"{1000 * segmented:>8.0f}ms {stt.segments:>9}")
+        print(f"  {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local mock of the OpenAI transcription endpoint; without --serve, compares the "
+                    "single-request and segmented STT paths on WAV files against it.")
+    parser.add_argument('wavs', nargs='*', help='Utterance recordings to run through both paths')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', action='store_true', help='Only run the server (point base_url at it)')
+    parser.add_argument('--base_s', type=float, default=MockSttHandler.base_s, help='Fixed delay per request')
+    parser.add_argument('--per_audio_s', type=float, default=MockSttHandler.per_audio_s,
+                        help='Extra delay per second of uploaded audio')
+    parser.add_argument('--speed', type=float, default=1.0, help='Capture speed relative to real time')
+    args = parser.parse_args()
+
+    MockSttHandler.base_s = args.base_s
+    MockSttHandler.per_audio_s = args.per_audio_s
+    server = serve(args.port)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    if args.serve:
+        print(f"Mock transcription server on {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    from chat_gpt_client import OpenAIClient
+
+    client = OpenAIClient(api_key="mock", model="mock", base_url=base_url)
+    if not args.wavs:
+        # Two sentences with a pause, about 5 s: enough for one cut.
+        rng = np.random.default_rng(0)
+        pcm = rng.normal(0, 60, 5 * SAMPLE_RATE)
+        pcm[int(0.2 * SAMPLE_RATE):int(2.4 * SAMPLE_RATE)] *= 50
+        pcm[int(2.9 * SAMPLE_RATE):int(4.6 * SAMPLE_RATE)] *= 50
+        recordings = [("synthetic", pcm.astype(np.int16))]
+    else:
+        recordings = [(path, load_wav(path)) for path in args.wavs]
+
+    asyncio.run(compare(client, recordings, args.speed))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
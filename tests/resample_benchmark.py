@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from scipy import signal
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from resampler import StreamingResampler
+
+OUT_RATE = 16000
+BLOCKS_PER_SECOND = 50  # AudioModule's 20 ms blocks
+
+
+def fft_resample_block(block, in_rate):
+    """The old AudioModule.resample: an independent FFT resample per block."""
+    resample = signal.resample(block, int(len(block) / in_rate * OUT_RATE))
+    return np.array(resample, dtype=np.int16)
+
+
+def bench(name, fn, blocks, seconds):
+    start = time.process_time()
+    out = [fn(b) for b in blocks]
+    cpu = time.process_time() - start
+    print(f"  {name:<10} {1000 * cpu / seconds:7.2f} ms CPU per second of audio")
+    return np.concatenate(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU cost of per-block FFT vs streaming polyphase resampling.")
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--rates', type=int, nargs='+', default=[44100, 48000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for in_rate in args.rates:
+        n = int(args.seconds * in_rate)
+        t = np.arange(n) / in_rate
+        # Speech-band tone plus noise: enough to show boundary artifacts.
+        audio = (6000 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 300, n)).astype(np.int16)
+        block = in_rate // BLOCKS_PER_SECOND
+        blocks = [audio[i:i + block] for i in range(0, n - block + 1, block)]
+
+        print(f"{in_rate} Hz -> {OUT_RATE} Hz, {args.seconds:.0f}s of audio in {block}-sample blocks")
+        fft_out = bench("fft", lambda b: fft_resample_block(b, in_rate), blocks, args.seconds)
+        rs = StreamingResampler(in_rate, OUT_RATE)
+        poly_out = bench("polyphase", rs.process, blocks, args.seconds)
+
+        # Boundary artifacts show up as jumps at every block edge of the FFT output.
+        edge = OUT_RATE // BLOCKS_PER_SECOND
+        for name, out in (("fft", fft_out), ("polyphase", poly_out)):
+            d = np.abs(np.diff(out.astype(np.int32)))
+            at_edges = d[edge - 1::edge].mean()
+            print(f"  {name:<10} mean |step| at block edges {at_edges:7.1f}, elsewhere {d.mean():7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import glob
+import argparse
+
+import numpy as np
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from playback import JitterBuffer
+from replay import load_wav
+from resampler import StreamingResampler
+
+TTS_RATE = 24000
+SPEED = 1.3
+
+
+def download(pcm, chunk_s, rtf, jitter_s, rng):
+    """TTS chunks with their arrival times: synthesis at `rtf` x real time plus random network stalls."""
+    n = int(chunk_s * TTS_RATE)
+    t = 0.0
+    for i in range(0, len(pcm), n):
+        chunk = pcm[i:i + n]
+        t += len(chunk) / TTS_RATE * rtf + rng.exponential(jitter_s)
+        yield t, chunk
+
+
+def simulate(pcm, play_rate, args, rng):
+    """
+    Run one reply through the streaming path against a simulated sound card that
+    pulls `block` frames every block period. Returns (first audio s, underruns,
+    stalled s, download s).
+    """
+    buffer = JitterBuffer(play_rate, channels=1, min_prefill_s=args.prefill)
+    buffer.begin()
+    resampler = StreamingResampler(int(TTS_RATE * SPEED), play_rate)
+    chunks = list(download(pcm, args.chunk_s, args.rtf, args.jitter_s, rng))
+    block = 512
+    period = block / play_rate
+    out = np.zeros((block, 1), dtype=np.int16)
+    clock, i, first, stalled, underruns = 0.0, 0, None, 0.0, buffer.underruns
+    while True:
+        while i < len(chunks) and chunks[i][0] <= clock:
+            buffer.write(resampler.process(chunks[i][1])[:, None])
+            i += 1
+            if i == len(chunks):
+                buffer.end()
+        filled = buffer.read(out)
+        if filled and first is None:
+            first = clock
+        elif first is not None and filled < block and not buffer.drained.is_set():
+            stalled += (block - filled) / play_rate
+        if buffer.drained.is_set():
+            break
+        clock += period
+    return first, buffer.underruns - underruns, stalled, chunks[-1][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time to first audio of TTS replies: whole-response playback vs streaming through the jitter "
+                    "buffer, on a simulated download.")
+    parser.add_argument('wavs', nargs='*', help='TTS recordings (default: audio/tts/*/*intro*.wav)')
+    parser.add_argument('--play_rate', type=int, default=48000)
+    parser.add_argument('--chunk_s', type=float, default=0.1, help='Audio per downloaded chunk')
+    parser.add_argument('--rtf', type=float, default=0.3, help='Synthesis time per second of audio')
+    parser.add_argument('--jitter_s', type=float, default=0.02, help='Mean extra delay per chunk')
+    parser.add_argument('--prefill', type=float, default=0.06, help='Minimum jitter buffer prefill in seconds')
+    args = parser.parse_args()
+
+    paths = args.wavs
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(os.path.dirname(core_path), 'audio', 'tts', '*', '*intro*.wav')))[:8]
+    rng = np.random.default_rng(0)
+    print(f"{'reply':<32} {'length':>7} {'whole':>7} {'stream':>7} {'underruns':>10} {'stalled':>8}")
+    for path in paths:
+        pcm = load_wav(path, TTS_RATE)
+        first, underruns, stalled, done = simulate(pcm, args.play_rate, args, rng)
+        # The old path: download everything, then resample and play (resampling time ignored).
+        print(f"{os.path.basename(path):<32} {len(pcm) / TTS_RATE:>6.1f}s {done:>6.2f}s {first:>6.2f}s "
+              f"{underruns:>10} {stalled:>7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+core_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(core_path))
+
+from replay import load_wav
+from vad_backends import FRAME_LENGTH, SAMPLE_RATE, VAD_BACKENDS, make_vad_backend
+
+FRAME_S = FRAME_LENGTH / SAMPLE_RATE
+
+
+def classify(backend, frames, threshold):
+    """Run a whole file through `backend` in its batch size; returns (decisions, CPU s, calls)."""
+    step = backend.batch_frames
+    out = np.zeros(len(frames), dtype=bool)
+    backend.reset()
+    calls = 0
+    start = time.process_time()
+    for i in range(0, len(frames) - step + 1, step):
+        out[i:i + step] = backend.is_speech(frames[i:i + step], threshold)
+        calls += 1
+    return out, time.process_time() - start, calls
+
+
+def label_mask(segments, n_frames):
+    """Frame mask from [[start_s, end_s], ...] speech segments."""
+    mask = np.zeros(n_frames, dtype=bool)
+    for start, end in segments:
+        mask[int(start / FRAME_S):int(np.ceil(end / FRAME_S))] = True
+    return mask
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare CobraDetector VAD backends on recordings: CPU, decision latency, accuracy.")
+    parser.add_argument('wavs', nargs='+', help='WAV files or directories of WAV files')
+    parser.add_argument('--backends', nargs='+', choices=VAD_BACKENDS, default=['webrtc', 'energy'])
+    parser.add_argument('--vad_model', help='Model for the neural backend (.onnx or .tflite)')
+    parser.add_argument('--batch_frames', type=int, default=4, help='Frames per neural VAD call')
+    parser.add_argument('--threshold', type=float, default=0.5)
+    parser.add_argument('--segments', help='JSON {"rel/path.wav": [[start_s, end_s], ...]} of speech; '
+                                           'without it backends are compared against the first one')
+    args = parser.parse_args()
+
+    paths = []
+    for p in args.wavs:
+        paths.extend(sorted(glob.glob(os.path.join(p, '**', '*.wav'), recursive=True)) if os.path.isdir(p) else [p])
+    labels = {}
+    if args.segments:
+        with open(args.segments) as f:
+            labels = json.load(f)
+    root = args.wavs[0] if os.path.isdir(args.wavs[0]) else os.path.dirname(args.wavs[0])
+
+    backends = {name: make_vad_backend(name, model_path=args.vad_model, batch_frames=args.batch_frames)
+                for name in args.backends}
+    totals = {name: {"cpu": 0.0, "calls": 0, "tp": 0, "fp": 0, "fn": 0, "agree": 0} for name in backends}
+    audio_s = 0.0
+    n_total = 0
+    for path in paths:
+        pcm = load_wav(path)
+        n = len(pcm) // FRAME_LENGTH
+        frames = pcm[:n * FRAME_LENGTH].reshape(n, FRAME_LENGTH)
+        audio_s += n * FRAME_S
+        n_total += n
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        truth = label_mask(labels[rel], n) if rel in labels else None
+        reference = None
+        for name, backend in backends.items():
+            decisions, cpu, calls = classify(backend, frames, args.threshold)
+            t = totals[name]
+            t["cpu"] += cpu
+            t["calls"] += calls
+            if reference is None:
+                reference = decisions
+            t["agree"] += int((decisions == reference).sum())
+            if truth is not None:
+                t["tp"] += int((decisions & truth).sum())
+                t["fp"] += int((decisions & ~truth).sum())
+                t["fn"] += int((~decisions & truth).sum())
+
+    print(f"{len(paths)} file(s), {audio_s:.0f}s of audio, threshold {args.threshold}")
+    print(f"  {'backend':<8} {'batch':>5} {'ms CPU/s':>9} {'ms/call':>8} {'latency':>8} {'agree':>6} "
+          f"{'prec':>6} {'recall':>6}")
+    for name, backend in backends.items():
+        t = totals[name]
+        precision = t["tp"] / (t["tp"] + t["fp"]) if t["tp"] + t["fp"] else float('nan')
+        recall = t["tp"] / (t["tp"] + t["fn"]) if t["tp"] + t["fn"] else float('nan')
+        # Frames wait for the rest of their batch before a decision is made.
+        latency_ms = (backend.batch_frames - 1) * FRAME_S * 1000
+        print(f"  {name:<8} {backend.batch_frames:>5} {1000 * t['cpu'] / max(audio_s, 1e-9):>9.2f} "
+              f"{1000 * t['cpu'] / max(t['calls'], 1):>8.3f} {latency_ms:>6.0f}ms "
+              f"{t['agree'] / max(n_total, 1):>6.1%} {precision:>6.1%} {recall:>6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import os
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "uselessbox", "tts")
+DEFAULT_MAX_MB = 128
+
+log = logging.getLogger(__name__)
+
+
+def cache_key(text: str, voice: str, style: str, model: str, gain: float, speed: float, rate: int) -> str:
+    """Content address of one rendering: everything that changes the samples that reach the card."""
+    fields = {"text": text.strip(), "voice": voice, "style": style, "model": model,
+              "gain": gain, "speed": speed, "rate": rate}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    """
+    Content-addressed store of rendered TTS sentences on disk.
+
+    Each entry is the mono int16 PCM of one sentence exactly as it is fed to
+    the player (gain, speed-up and resampling to the card rate already
+    applied), in `<sha256>.pcm`, keyed by cache_key(). A hit is one file read,
+    no network and no DSP.
+
+    The index (key -> size, in LRU order) lives in RAM and is rebuilt from the
+    directory at start-up, ordered by mtime; a hit touches the file's mtime so
+    the order survives restarts. When the total exceeds `max_bytes` the least
+    recently used entries are deleted, which keeps the SD card footprint fixed.
+    Files are written to a temporary name and renamed, so a power cut never
+    leaves a truncated entry.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = OrderedDict()
+        self._bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".pcm"):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+            elif entry.name.endswith(".tmp"):
+                os.remove(entry.path)  # interrupted write
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+        self._evict()
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pcm")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str):
+        """The cached PCM for `key`, or None."""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            pcm = np.fromfile(path, dtype=np.int16)
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._bytes -= self._index.pop(key, 0)
+                self.misses += 1
+            return None
+        self.hits += 1
+        return pcm
+
+    def put(self, key: str, pcm: np.ndarray):
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        if pcm.nbytes > self.max_bytes:
+            return
+        tmp = self._path(key) + ".tmp"
+        try:
+            pcm.tofile(tmp)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            log.warning("TTS cache write failed: %s", e)
+            return
+        with self._lock:
+            self._bytes += pcm.nbytes - self._index.pop(key, 0)
+            self._index[key] = pcm.nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for key in self._index:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._bytes = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or clear the TTS sentence cache.")
+    parser.add_argument('--dir', default=CACHE_DIR)
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+
+    cache = TtsCache(args.dir, max_bytes=1 << 62)  # don't evict just by looking
+    print(f"{args.dir}: {len(cache)} entries, {cache.size_bytes / 1e6:.1f} MB")
+    if args.clear:
+        cache.clear()
+        print("Cleared.")
+
+
+if __name__ == '__main__':
+    main()
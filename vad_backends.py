@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 480  # CobraDetector's 30 ms frames
+
+VAD_BACKENDS = ("webrtc", "energy", "neural")
+
+
+class VadBackend:
+    """
+    Speech / non-speech decision for CobraDetector, one 30 ms frame at a time.
+
+    `is_speech` takes a (batch_frames, frame_length) int16 array and returns one
+    bool per frame. CobraDetector reads `batch_frames` frames before each call, so
+    a backend that is cheaper per frame when batched pays for it with
+    (batch_frames - 1) * 30 ms of extra decision latency. The detector's ambient
+    energy gate is applied on top of every backend.
+    """
+
+    batch_frames = 1
+
+    def reset(self):
+        """Called at the start of every utterance capture."""
+
+    def is_speech(self, frames: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+        raise NotImplementedError
+
+
+class WebRtcVadBackend(VadBackend):
+    """
+    webrtcvad (the GMM VAD from WebRTC), CobraDetector's original engine.
+
+    `threshold` picks the aggressiveness: <0.4 -> 1 (permissive), <0.7 -> 2,
+    else 3 (strict); `aggressiveness` fixes it instead.
+    """
+
+    def __init__(self, aggressiveness: int = None):
+        import webrtcvad
+        self._webrtcvad = webrtcvad
+        self.aggressiveness = aggressiveness
+        self._vads = {}
+
+    def _vad(self, threshold):
+        mode = self.aggressiveness
+        if mode is None:
+            mode = 1 if threshold < 0.4 else (2 if threshold < 0.7 else 3)
+        if mode not in self._vads:
+            self._vads[mode] = self._webrtcvad.Vad(mode)
+        return self._vads[mode]
+
+    def is_speech(self, frames, threshold=0.5):
+        vad = self._vad(threshold)
+        # webrtcvad takes any byte buffer; a uint8 view avoids a bytes copy.
+        return np.array([vad.is_speech(np.ascontiguousarray(f).view(np.uint8).data, SAMPLE_RATE)
+                         for f in frames], dtype=bool)
+
+
+class EnergyVadBackend(VadBackend):
+    """
+    No voice model at all: every frame is a candidate and CobraDetector's
+    ambient energy gate alone decides. Cheapest option; fine in a quiet room,
+    triggers on any loud noise.
+    """
+
+    def is_speech(self, frames, threshold=0.5):
+        return np.ones(len(frames), dtype=bool)
+
+
+class NeuralVadBackend(VadBackend):
+    """
+    Small neural frame classifier (.onnx via onnxruntime, .tflite via tflite_runtime).
+
+    The model takes a float32 batch of frames scaled to [-1, 1], shape
+    (batch, frame_length), and returns one speech probability per frame (any
+    output shape with `batch` elements). All `batch_frames` frames are scored in
+    one invocation, which amortizes the interpreter overhead that dominates for
+    tiny models on the Pi Zero: 4 frames per call costs little more than one.
+    A frame is speech when its probability is at least `threshold`.
+
+    Models with a fixed batch dimension are padded with zeros up to it.
+    """
+
+    def __init__(self, model_path: str, batch_frames: int = 4, num_threads: int = 1):
+        if not os.path.isfile(model_path):
+            raise OSError(f"Couldn't find VAD model at '{model_path}'.")
+        self.model_path = model_path
+        self.batch_frames = max(1, batch_frames)
+        if model_path.endswith(".onnx"):
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = num_threads
+            self._session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            self._input = self._session.get_inputs()[0].name
+            fixed = self._session.get_inputs()[0].shape[0]
+            self._run = self._run_onnx
+        else:
+            import tflite_runtime.interpreter as tflite
+            self._interpreter = tflite.Interpreter(model_path=model_path, num_threads=num_threads)
+            detail = self._interpreter.get_input_details()[0]
+            fixed = int(detail["shape"][0])
+            if fixed != self.batch_frames and detail["shape_signature"][0] == -1:
+                self._interpreter.resize_tensor_input(detail["index"], (self.batch_frames, FRAME_LENGTH))
+                fixed = self.batch_frames
+            self._interpreter.allocate_tensors()
+            self._run = self._run_tflite
+        self._fixed_batch = fixed if isinstance(fixed, int) and fixed > 0 else None
+        if self._fixed_batch is not None and self._fixed_batch < self.batch_frames:
+            raise ValueError(f"VAD model batch size {self._fixed_batch} < batch_frames {self.batch_frames}.")
+
+    def _run_onnx(self, x):
+        return self._session.run(None, {self._input: x})[0]
+
+    def _run_tflite(self, x):
+        detail = self._interpreter.get_input_details()[0]
+        self._interpreter.set_tensor(detail["index"], x)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._interpreter.get_output_details()[0]["index"])
+
+    def probabilities(self, frames: np.ndarray) -> np.ndarray:
+        n = len(frames)
+        x = np.asarray(frames, dtype=np.float32) * (1.0 / 32768.0)
+        if self._fixed_batch is not None and n < self._fixed_batch:
+            x = np.concatenate((x, np.zeros((self._fixed_batch - n, x.shape[1]), dtype=np.float32)))
+        return np.asarray(self._run(x), dtype=np.float32).reshape(len(x), -1)[:n, -1]
+
+    def is_speech(self, frames, threshold=0.5):
+        return self.probabilities(frames) >= threshold
+
+
+def make_vad_backend(name: str = "webrtc", model_path: str = None, batch_frames: int = 4,
+                     aggressiveness: int = None) -> VadBackend:
+    """Backend by config name: "webrtc", "energy" or "neural" (needs `model_path`)."""
+    if name == "webrtc":
+        return WebRtcVadBackend(aggressiveness)
+    if name == "energy":
+        return EnergyVadBackend()
+    if name == "neural":
+        if not model_path:
+            raise ValueError("The neural VAD backend needs a model path.")
+        return NeuralVadBackend(model_path, batch_frames=batch_frames)
+    raise ValueError(f"Unknown VAD backend '{name}'; expected one of {VAD_BACKENDS}.")
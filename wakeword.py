@@ -1,6 +1,14 @@
 import os
+import glob
+import json
+import time
+import queue
+import logging
 import argparse
 import asyncio
+import platform
+import threading
+from collections import deque
 from datetime import datetime
 
 import numpy as np
@@ -9,7 +17,10 @@ import numpy as np
 # On the Pi Zero 2 W that's ~89 ms per 80 ms frame (too slow); 3 threads brings
 # it to ~63 ms (real-time with headroom). Patch the interpreter ctor before
 # importing the Model so every interpreter oWW builds is multi-threaded.
-_OWW_THREADS = int(os.getenv("OWW_THREADS", "3"))
+# OWW_THREADS=auto measures the best count for this board once (see
+# calibrate_threads) instead of trusting the Pi Zero 2 W figure.
+_OWW_THREADS_ENV = os.getenv("OWW_THREADS", "3").strip().lower()
+_OWW_THREADS = 3 if _OWW_THREADS_ENV == "auto" else int(_OWW_THREADS_ENV)
 try:
     import tflite_runtime.interpreter as _tflite
     _orig_interpreter = _tflite.Interpreter
@@ -17,15 +28,439 @@ try:
         kwargs["num_threads"] = _OWW_THREADS
         return _orig_interpreter(*args, **kwargs)
     _tflite.Interpreter = _threaded_interpreter
+    _THREADS_PATCHED = True
 except ImportError:
-    pass  # off-Pi (no tflite_runtime): openwakeword falls back to its own backend
+    _THREADS_PATCHED = False  # off-Pi (no tflite_runtime): openwakeword falls back to its own backend
+_threads_calibrated = False
 
 from openwakeword.model import Model
 from pvrecorder import PvRecorder
 
+from latency import LatencyHistogram
+
 # openWakeWord operates on 80ms frames at 16kHz
 FRAME_LENGTH = 1280
 SAMPLE_RATE = 16000
+FRAME_S = FRAME_LENGTH / SAMPLE_RATE
+
+# What the capture thread does when the inference queue is full:
+#   "drop_oldest"    discard the oldest queued frame (lag stays bounded by the queue)
+#   "skip_to_latest" as drop_oldest, and after a stall longer than max_lag_s the
+#                    worker also discards everything queued and resumes on the newest frame
+#   "block"          no capture thread: inference reads the source itself, never
+#                    drops and never reads ahead (replay / offline use)
+BACKPRESSURE_POLICIES = ("drop_oldest", "skip_to_latest", "block")
+
+log = logging.getLogger(__name__)
+
+
+def _join_started(threads):
+    for t in threads:
+        if t.ident is not None:
+            t.join()
+
+
+THREADS_CACHE_FILE = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                                  "uselessbox", "oww_threads.json")
+
+
+def _cpu_key() -> str:
+    """Board + kernel identity the thread count is cached under."""
+    model = None
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                # Raspberry Pi kernels report "Model : Raspberry Pi Zero 2 W Rev 1.0";
+                # x86 reports "model name"; either identifies the board well enough.
+                if name.strip() in ("Model", "model name") and value.strip():
+                    model = value.strip()
+                    if name.strip() == "Model":
+                        break
+    except OSError:
+        pass
+    return f"{model or platform.processor() or platform.machine()} | {platform.release()} | {os.cpu_count()} cpus"
+
+
+def calibrate_threads(model_paths, max_threads: int = None, frames: int = 40, tolerance: float = 0.05,
+                      cache_file: str = THREADS_CACHE_FILE, force: bool = False) -> int:
+    """
+    Pick the tflite interpreter thread count for this board and apply it.
+
+    Loads `model_paths` once per candidate count (1..max_threads, default all
+    cores), times `frames` Model.predict calls on synthetic noise after a short
+    warm-up, and picks the fewest threads within `tolerance` of the fastest
+    median: extra threads that buy less than that only take CPU away from the
+    LEDs, servos and VAD. The result is stored in `cache_file` under the CPU
+    model and kernel release, so later starts on the same box reuse it without
+    measuring. Returns the thread count now in effect.
+    """
+    global _OWW_THREADS, _threads_calibrated
+    _threads_calibrated = True
+    if not _THREADS_PATCHED:
+        log.info("tflite_runtime not installed; thread calibration skipped.")
+        return _OWW_THREADS
+
+    key = _cpu_key()
+    cache = {}
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if not force and isinstance(cache.get(key), dict) and "threads" in cache[key]:
+        _OWW_THREADS = int(cache[key]["threads"])
+        log.info("Wake word tflite threads: %d (cached for %s)", _OWW_THREADS, key)
+        return _OWW_THREADS
+
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 1000, FRAME_LENGTH * (frames + 5)).astype(np.int16)
+    timings = {}
+    for n in range(1, (max_threads or os.cpu_count() or 1) + 1):
+        _OWW_THREADS = n
+        model = Model(wakeword_models=list(model_paths), inference_framework="tflite")
+        per_frame = []
+        for f in range(frames + 5):
+            frame = audio[f * FRAME_LENGTH:(f + 1) * FRAME_LENGTH]
+            started = time.perf_counter()
+            model.predict(frame)
+            if f >= 5:  # the first predicts fill the feature buffers
+                per_frame.append(time.perf_counter() - started)
+        timings[n] = float(np.median(per_frame))
+        log.info("Wake word calibration: %d thread(s) %.1f ms/frame", n, timings[n] * 1000)
+
+    fastest = min(timings.values())
+    _OWW_THREADS = min(n for n, t in timings.items() if t <= fastest * (1.0 + tolerance))
+    cache[key] = {
+        "threads": _OWW_THREADS,
+        "ms_per_frame": {str(n): round(t * 1000, 2) for n, t in timings.items()},
+        "measured": datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        log.warning("Could not store thread calibration in %s: %s", cache_file, e)
+    log.info("Wake word tflite threads: %d (%.1f ms/frame)", _OWW_THREADS, timings[_OWW_THREADS] * 1000)
+    return _OWW_THREADS
+
+
+class InferenceStats:
+    """Counters of the wake-word inference worker, cumulative across waits."""
+
+    def __init__(self):
+        self.frames = 0           # frames taken off the queue
+        self.predicts = 0         # Model.predict calls, including gate warm-up
+        self.gated = 0            # frames the silence gate kept away from the model
+        self.dropped = 0          # frames discarded because the queue was full
+        self.coalesced = 0        # frames skipped by stall catch-up
+        self.stalls = 0           # catch-ups performed
+        self.queue_depth = 0      # frames waiting behind the one being scored
+        self.max_queue_depth = 0
+        self.lag_s = 0.0          # age of the frame being scored (capture -> predict)
+        self.max_lag_s = 0.0
+        self.overruns = 0         # frames whose predict(s) took longer than the frame lasts
+        self.predict_s = 0.0      # total time spent in Model.predict
+        self.read_wait = LatencyHistogram()   # time blocked in recorder.read
+        self.predict = LatencyHistogram()     # one Model.predict call
+        self.end_to_end = LatencyHistogram()  # frame captured -> its scores available
+
+    @property
+    def duty_cycle(self) -> float:
+        """Fraction of frames that cost a predict (1.0 without a silence gate)."""
+        return self.predicts / self.frames if self.frames else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        """Predict time per second of audio predicted; above 1.0 cannot keep up."""
+        return self.predict_s / (self.predicts * FRAME_S) if self.predicts else 0.0
+
+    def as_dict(self) -> dict:
+        d = {k: v for k, v in vars(self).items() if not isinstance(v, LatencyHistogram)}
+        d["duty_cycle"] = round(self.duty_cycle, 3)
+        d["real_time_factor"] = round(self.real_time_factor, 3)
+        for k, v in vars(self).items():
+            if isinstance(v, LatencyHistogram):
+                d[k] = v.summary()
+        return d
+
+
+class SilenceGate:
+    """
+    Cheap cascaded speech gate that keeps silent frames away from Model.predict.
+
+    Stage 1 compares frame RMS with an adaptive noise floor (`ratio` times the
+    floor, never below `min_rms`); stage 2, with `use_vad`, also requires one of
+    the frame's 30 ms sub-frames to be voiced according to webrtcvad. Only frames
+    passing stage 1 pay for stage 2. The floor follows quiet frames and creeps up
+    by `active_creep` per active frame, so a lasting rise in room noise (a fan,
+    the TV) closes the gate again after a few seconds.
+
+    The model's streaming feature buffers stay consistent across the gap:
+    - closing is delayed by `hangover_frames` after the last active frame, so the
+      last audio the model saw before a gap is itself quiet, and a wake word whose
+      score peaks after the phrase ends is still scored;
+    - opening first returns the `warmup_frames` quiet frames that preceded the
+      onset, which are predicted before the onset frame so the first syllable and
+      its lead-in are in the buffers, as they would be without the gate.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 2.5,
+        min_rms: float = 150.0,
+        hangover_frames: int = 12,  # ~1 s at 80 ms frames
+        warmup_frames: int = 4,
+        use_vad: bool = False,
+        vad_aggressiveness: int = 2,
+        active_creep: float = 0.005,  # floor x1.005 per loud frame: 3x louder room re-learned in ~3 s
+    ):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.hangover_frames = hangover_frames
+        self.warmup_frames = warmup_frames
+        self.use_vad = use_vad
+        self.vad_aggressiveness = vad_aggressiveness
+        self.active_creep = active_creep
+        self._recent = deque(maxlen=warmup_frames)
+        self._vad = None
+        if use_vad:
+            import webrtcvad
+            self._vad = webrtcvad.Vad(vad_aggressiveness)
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = None
+        self._hangover = 0
+        self._recent.clear()
+
+    def _voiced(self, frame: np.ndarray) -> bool:
+        sub = SAMPLE_RATE * 30 // 1000
+        for start in range(0, len(frame) - sub + 1, sub):
+            if self._vad.is_speech(frame[start:start + sub].tobytes(), SAMPLE_RATE):
+                return True
+        return False
+
+    def update(self, frame: np.ndarray):
+        """
+        Classify one frame. Returns (is_open, warmup): when the gate opens,
+        `warmup` holds the preceding quiet frames to predict before this one.
+        """
+        x = frame.astype(np.float32)
+        rms = float(np.sqrt(np.dot(x, x) / len(x)))
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        active = rms >= max(self.min_rms, self.ratio * self.noise_floor)
+        if active and self._vad is not None:
+            active = self._voiced(frame)
+        if not active:
+            # Track the floor quickly downwards, slowly upwards, on quiet frames.
+            rate = 0.1 if rms < self.noise_floor else 0.01
+            self.noise_floor += rate * (rms - self.noise_floor)
+        elif rms > self.noise_floor:
+            # A lasting rise (fan, TV) would otherwise count as active forever and
+            # hold the gate open; speech pauses pull the floor back down quickly.
+            self.noise_floor = min(rms, self.noise_floor * (1.0 + self.active_creep))
+
+        was_open = self._hangover > 0
+        if active:
+            self._hangover = self.hangover_frames
+        elif self._hangover > 0:
+            self._hangover -= 1
+        is_open = self._hangover > 0 or active
+
+        warmup = []
+        if is_open and not was_open:
+            warmup = list(self._recent)
+            self._recent.clear()
+        if not is_open:
+            self._recent.append(frame)
+        return is_open, warmup
+
+
+SMOOTHING_MODES = ("none", "ema", "peak")
+
+
+class AdaptiveThresholds:
+    """
+    Noise-relative wake-word triggering with optional score smoothing.
+
+    For every keyword the background score distribution is tracked online as an
+    exponentially weighted mean and variance over frames that did not trigger;
+    the effective threshold is `mu + k * sigma`, kept within
+    [threshold - max_below, threshold + max_above] of the keyword's fixed
+    threshold. A quiet room lets a soft phrase through a little below the fixed
+    threshold; a room where the models keep scoring 0.2-0.3 on TV or kitchen noise
+    raises the bar instead of firing on it. Until `warmup_frames` background
+    frames have been seen the fixed thresholds apply unchanged.
+
+    Background samples are winsorized at `mu + 3 sigma` so a near miss cannot
+    drag the estimate up in one frame. The state survives between waits (it is
+    the room that is being learned) and is only reset when the set of keywords
+    changes.
+
+    Smoothing runs before the comparison: "ema" averages the score stream with
+    weight `ema_alpha` on the newest frame, "peak" holds the maximum of the last
+    `peak_frames` frames, which lets a one-frame peak satisfy `trigger_frames` > 1.
+    `smoothing`, `ema_alpha` and `peak_frames` each take either one value for
+    every keyword or a per-keyword dict like the detector's `thresholds`, e.g.
+    smoothing={"knight-rider": "peak"}; keywords missing from a dict get the
+    defaults ("none", 0.5, 3).
+    """
+
+    def __init__(
+        self,
+        k: float = 6.0,
+        max_below: float = 0.15,
+        max_above: float = 0.25,
+        alpha: float = 0.002,  # ~40 s of speech-free frames
+        warmup_frames: int = 250,  # 20 s
+        smoothing="none",  # mode, or {keyword: mode}
+        ema_alpha=0.5,  # float, or {keyword: float}
+        peak_frames=3,  # int, or {keyword: int}
+    ):
+        modes = smoothing.values() if isinstance(smoothing, dict) else [smoothing]
+        if any(m not in SMOOTHING_MODES for m in modes):
+            raise ValueError(f"`smoothing` must be one of {SMOOTHING_MODES}.")
+        self.k = k
+        self.max_below = max_below
+        self.max_above = max_above
+        self.alpha = alpha
+        self.warmup_frames = warmup_frames
+        self.smoothing = smoothing
+        self.ema_alpha = ema_alpha
+        self.peak_frames = peak_frames
+        self.mean = None
+        self.var = None
+        self.background_frames = 0
+        self.effective = None
+        self._keywords = None
+        self._modes = None
+        self._smoothed = None
+        self._peak = None
+
+    @staticmethod
+    def _per_keyword(setting, keywords, n, default):
+        if not isinstance(setting, dict):
+            return [setting] * n
+        if keywords is None:
+            return [default] * n
+        return [setting.get(kw, default) for kw in keywords]
+
+    def reset(self, n_keywords: int, keywords=None):
+        """Forget the learned background (new model set); `keywords` resolve per-keyword smoothing."""
+        self.mean = np.zeros(n_keywords, dtype=np.float64)
+        self.var = np.zeros(n_keywords, dtype=np.float64)
+        self.background_frames = 0
+        self.effective = None
+        self._keywords = list(keywords) if keywords is not None else None
+        self._modes = np.array(self._per_keyword(self.smoothing, keywords, n_keywords, "none"))
+        self._ema_alpha = np.array(self._per_keyword(self.ema_alpha, keywords, n_keywords, 0.5), dtype=np.float64)
+        peak = np.maximum(1, self._per_keyword(self.peak_frames, keywords, n_keywords, 3))
+        # Row r of the peak history (oldest first) counts for keyword i if it is among its last peak[i] frames.
+        self._peak_depth = int(peak.max())
+        self._peak_mask = np.arange(self._peak_depth)[::-1, None] < peak[None, :]
+        self.reset_smoothing()
+
+    def reset_smoothing(self):
+        """Drop the smoothing history (after a gap in the score stream)."""
+        self._smoothed = None
+        self._peak = None
+
+    def smooth(self, raw: np.ndarray) -> np.ndarray:
+        modes = self._modes
+        if modes is None or len(modes) != len(raw):
+            self.reset(len(raw))
+            modes = self._modes
+        out = raw
+        if (modes == "ema").any():
+            if self._smoothed is None:
+                self._smoothed = raw.copy()
+            else:
+                self._smoothed += self._ema_alpha * (raw - self._smoothed)
+            out = np.where(modes == "ema", self._smoothed, out)
+        if (modes == "peak").any():
+            if self._peak is None:
+                self._peak = deque(maxlen=self._peak_depth)
+            self._peak.append(raw)
+            history = np.array(self._peak)
+            mask = self._peak_mask[-len(history):]
+            out = np.where(modes == "peak", np.where(mask, history, -np.inf).max(axis=0), out)
+        return out
+
+    def update(self, raw: np.ndarray, thresholds: np.ndarray, keywords=None):
+        """
+        Process one frame of scores (keywords order). Returns (scores, limits):
+        the smoothed scores and the thresholds to compare them with. Frames that
+        stay below their limit feed the background estimate afterwards.
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        if self.mean is None or len(self.mean) != len(raw) or \
+                (keywords is not None and list(keywords) != self._keywords):
+            self.reset(len(raw), keywords)
+        scores = self.smooth(raw)
+
+        if self.background_frames < self.warmup_frames:
+            limits = thresholds
+        else:
+            sigma = np.sqrt(self.var)
+            limits = np.clip(self.mean + self.k * sigma,
+                             np.maximum(thresholds - self.max_below, 0.05),
+                             np.minimum(thresholds + self.max_above, 0.99))
+        self.effective = limits
+
+        if (scores < limits).all():
+            n = self.background_frames
+            if n:
+                x = np.minimum(scores, self.mean + 3.0 * np.sqrt(self.var) + 1e-3)
+            else:
+                x = scores
+            # 1/n (a plain running mean) while warming up, then the configured rate.
+            a = max(self.alpha, 1.0 / (n + 1))
+            delta = x - self.mean
+            self.mean += a * delta
+            self.var = (1.0 - a) * (self.var + a * delta * delta)
+            self.background_frames = n + 1
+        return scores, limits
+
+    def as_dict(self, keywords) -> dict:
+        if self.mean is None:
+            return {}
+        sigma = np.sqrt(self.var)
+        d = {}
+        for i, kw in enumerate(keywords[:len(self.mean)]):
+            d[kw] = {"mean": round(float(self.mean[i]), 4), "sigma": round(float(sigma[i]), 4)}
+            if self.effective is not None:
+                d[kw]["threshold"] = round(float(self.effective[i]), 3)
+        return d
+
+
+class _ModelSet:
+    """
+    One generation of loaded models and their trigger settings.
+
+    Never mutated after construction: a reload builds a new one and swaps the
+    detector's reference, so each frame is scored against a consistent set.
+    """
+
+    def __init__(self, model, model_paths, threshold, thresholds, trigger_frames):
+        self.model = model
+        self.model_paths = list(model_paths)
+        self.model_snapshot = WakeWordDetector._snapshot(self.model_paths)
+        # "hey_octo.tflite" -> "hey-octo" (legacy Porcupine phrase names used by main.py).
+        # rsplit strips only the final extension; openWakeWord derives its predict()
+        # keys the same way, so scores.get(key) below stays in sync.
+        self.model_keys = [
+            os.path.basename(p).rsplit(".", 1)[0] for p in self.model_paths
+        ]
+        self.keywords = [k.replace("_", "-") for k in self.model_keys]
+        self.threshold = threshold
+        self.thresholds = [
+            thresholds.get(kw, threshold) for kw in self.keywords
+        ]
+        self.trigger_frames = max(1, trigger_frames)
 
 
 class WakeWordDetector:
@@ -57,6 +492,14 @@ class WakeWordDetector:
         trigger_frames: int = 1,
         device_index: int = -1,
         inference_framework: str = "tflite",
+        hub=None,  # shared AudioHub; None opens a private PvRecorder per wait call
+        queue_frames: int = 4,  # 320 ms of audio between capture and inference
+        backpressure: str = "drop_oldest",
+        max_lag_s: float = 0.5,  # stall threshold for "skip_to_latest"
+        silence_gate: SilenceGate = None,  # skip predict on silent frames
+        adaptive: AdaptiveThresholds = None,  # noise-relative thresholds / score smoothing
+        journal=None,  # score_journal.ScoreJournal: per-frame scores + audio around triggers
+        stats_log_interval_s: float = 300.0,  # 0 disables the periodic latency log line
         **_legacy_kwargs,  # tolerates old access_key/sensitivities call sites
     ):
         if isinstance(model_paths, str):
@@ -64,68 +507,395 @@ class WakeWordDetector:
         if not isinstance(model_paths, (list, tuple)) or not model_paths:
             raise ValueError("`model_paths` must be a non-empty string or list of strings.")
 
+        self.device_index = device_index
+        self.hub = hub
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"`backpressure` must be one of {BACKPRESSURE_POLICIES}.")
+        self.queue_frames = max(1, queue_frames)
+        self.backpressure = backpressure
+        self.max_lag_s = max_lag_s
+        self.stats = InferenceStats()
+        self.stats_log_interval_s = stats_log_interval_s
+        self._next_stats_log = time.monotonic() + stats_log_interval_s
+        self.silence_gate = silence_gate
+        self.adaptive = adaptive
+        self.journal = journal
+        self._inference_framework = inference_framework
+        self._base_thresholds = (threshold, dict(thresholds or {}), max(1, trigger_frames))
+        self._watcher = None
+
+        # The model is loaded once (a few seconds on a Pi Zero 2). Without a hub the
+        # recorder is opened per wait call so the mic is released for the utterance
+        # capture; with a hub the mic stays open and we only subscribe.
+        model, model_paths = self._load_model(model_paths)
+        self._active = _ModelSet(model, model_paths, threshold, thresholds or {}, trigger_frames)
+
+    def _load_model(self, model_paths):
         validated = []
         for path in model_paths:
             p = os.path.expanduser(path)
             if not os.path.isfile(p):
                 raise OSError(f"Couldn't find wake word model at '{path}'.")
             validated.append(p)
-        self.model_paths = validated
+        if _OWW_THREADS_ENV == "auto" and not _threads_calibrated:
+            calibrate_threads(validated)
+        model = Model(
+            wakeword_models=validated,
+            inference_framework=self._inference_framework,
+        )
+        return model, validated
 
-        # "hey_octo.tflite" -> "hey-octo" (legacy Porcupine phrase names used by main.py).
-        # rsplit strips only the final extension; openWakeWord derives its predict()
-        # keys the same way, so scores.get(key) below stays in sync.
-        self._model_keys = [
-            os.path.basename(p).rsplit(".", 1)[0] for p in self.model_paths
-        ]
-        self._keywords = [k.replace("_", "-") for k in self._model_keys]
+    @property
+    def model_paths(self):
+        return list(self._active.model_paths)
 
-        self.threshold = threshold
-        thresholds = thresholds or {}
-        self._thresholds = [
-            thresholds.get(kw, threshold) for kw in self._keywords
-        ]
-        self.trigger_frames = max(1, trigger_frames)
-        self.device_index = device_index
+    @property
+    def keywords(self):
+        return list(self._active.keywords)
 
-        # The model is loaded once (a few seconds on a Pi Zero 2); the recorder is
-        # opened per wait call so the mic is released for the utterance capture.
-        self._model = Model(
-            wakeword_models=self.model_paths,
-            inference_framework=inference_framework,
-        )
+    @property
+    def model_keys(self):
+        return list(self._active.model_keys)
 
     @property
-    def keywords(self):
-        return list(self._keywords)
+    def threshold(self):
+        return self._active.threshold
+
+    @property
+    def thresholds(self):
+        return dict(zip(self._active.keywords, self._active.thresholds))
+
+    @property
+    def trigger_frames(self):
+        return self._active.trigger_frames
+
+    def latency_stats(self) -> dict:
+        """
+        Snapshot of the inference counters and latency histograms (read wait,
+        per-predict time, capture-to-score lag) plus real-time factor, duty cycle
+        and overrun count; the same dict is logged every `stats_log_interval_s`.
+        """
+        stats = self.stats.as_dict()
+        if self.adaptive is not None:
+            stats["adaptive"] = self.adaptive.as_dict(self._active.keywords)
+        return stats
+
+    def watch(self, models_dir: str = None, thresholds_file: str = None, interval_s: float = 2.0):
+        """
+        Hot-reload models and thresholds while the detector keeps listening.
+
+        A daemon thread polls `models_dir/*.tflite` and `thresholds_file` (JSON:
+        {"threshold": 0.6, "thresholds": {"hey-octo": 0.5}, "trigger_frames": 1},
+        every key optional; missing keys fall back to the constructor values).
+        A change is applied once the files have stopped changing for one poll, so
+        a model still being copied is never loaded. New interpreters are built on
+        the watcher thread; the inference loop picks up the new generation between
+        two frames with a single reference swap. A broken model or config is
+        logged and the running generation stays in place. The thresholds file is
+        applied immediately, so the next wait already uses it.
+        """
+        if thresholds_file and os.path.isfile(thresholds_file):
+            self._reload(self._active.model_paths, thresholds_file)
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, args=(models_dir, thresholds_file, interval_s),
+                                         name="wakeword-watch", daemon=True)
+        self._watcher.start()
+
+    @staticmethod
+    def _snapshot(paths):
+        snap = {}
+        for p in paths:
+            try:
+                st = os.stat(p)
+                snap[p] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return snap
+
+    def _watched_paths(self, models_dir, thresholds_file):
+        paths = sorted(glob.glob(os.path.join(models_dir, "*.tflite"))) if models_dir else self._active.model_paths
+        return paths, ([thresholds_file] if thresholds_file else [])
+
+    def _watch_loop(self, models_dir, thresholds_file, interval_s):
+        models, config = self._watched_paths(models_dir, thresholds_file)
+        applied = self._snapshot(self._active.model_paths + config)
+        pending = None
+        while True:
+            time.sleep(interval_s)
+            models, config = self._watched_paths(models_dir, thresholds_file)
+            current = self._snapshot(models + config)
+            if current == applied:
+                pending = None
+                continue
+            if current != pending:
+                pending = current  # still changing (or just changed): wait one more poll
+                continue
+            if not models:
+                log.error("No wake word models in %s; keeping the loaded ones.", models_dir)
+            else:
+                self._reload(models, thresholds_file)
+            applied = current
+            pending = None
+
+    def _reload(self, model_paths, thresholds_file):
+        active = self._active
+        threshold, thresholds, trigger_frames = self._base_thresholds
+        thresholds = dict(thresholds)
+        if thresholds_file and os.path.isfile(thresholds_file):
+            try:
+                with open(thresholds_file) as f:
+                    config = json.load(f)
+                threshold = float(config.get("threshold", threshold))
+                thresholds.update({k: float(v) for k, v in config.get("thresholds", {}).items()})
+                trigger_frames = int(config.get("trigger_frames", trigger_frames))
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                log.error("Ignoring wake word thresholds file %s: %s", thresholds_file, e)
+                return
+        model = active.model
+        if list(model_paths) != active.model_paths or self._snapshot(model_paths) != active.model_snapshot:
+            try:
+                started = time.monotonic()
+                model, model_paths = self._load_model(model_paths)
+                log.info("Loaded wake word models %s in %.1fs", model_paths, time.monotonic() - started)
+            except Exception as e:
+                log.error("Wake word model reload failed, keeping the current models: %s", e)
+                return
+        # A single attribute store: the inference thread sees the old generation or
+        # the new one, never a mix.
+        self._active = _ModelSet(model, model_paths, threshold, thresholds, trigger_frames)
+        log.info("Wake word config active: %s (trigger_frames=%d)", self.thresholds, self.trigger_frames)
+
+    def score_frames(self, pcm: np.ndarray) -> np.ndarray:
+        """
+        Score a whole int16 recording frame by frame, exactly as the live loop does.
+
+        Returns a float32 matrix of shape (n_frames, n_keywords) with one row per
+        80 ms frame, columns in `keywords` order. A trailing partial frame is dropped.
+        """
+        active = self._active
+        pcm = np.asarray(pcm, dtype=np.int16)
+        n_frames = len(pcm) // FRAME_LENGTH
+        out = np.zeros((n_frames, len(active.model_keys)), dtype=np.float32)
+        self._reset(active)
+        for f in range(n_frames):
+            # Gated frames score 0; warm-up scores land on the frames they belong to.
+            results = self._predict(active, pcm[f * FRAME_LENGTH:(f + 1) * FRAME_LENGTH])
+            for j, scores in enumerate(results):
+                out[f - len(results) + 1 + j] = [scores.get(key, 0.0) for key in active.model_keys]
+        self._reset(active)
+        return out
+
+    def _reset(self, active):
+        active.model.reset()
+        if self.adaptive is not None:
+            self.adaptive.reset_smoothing()
+        if self.silence_gate is not None:
+            self.silence_gate.reset()
+
+    def _predict(self, active: _ModelSet, frame: np.ndarray) -> list:
+        """
+        Run one frame through the silence gate and the model. Returns the score
+        dicts of every frame actually predicted (gate warm-up frames first, then
+        this one), or [] when the frame was gated out.
+        """
+        gate = self.silence_gate
+        frames = [frame]
+        if gate is not None:
+            is_open, warmup = gate.update(frame)
+            if not is_open:
+                self.stats.gated += 1
+                return []
+            frames = warmup + frames
+        results = []
+        for f in frames:
+            started = time.perf_counter()
+            results.append(active.model.predict(f))
+            elapsed = time.perf_counter() - started
+            self.stats.predict.record(elapsed)
+            self.stats.predict_s += elapsed
+        self.stats.predicts += len(frames)
+        return results
+
+    def _open_recorder(self):
+        if self.hub is not None:
+            return self.hub.subscribe(FRAME_LENGTH)
+        return PvRecorder(frame_length=FRAME_LENGTH, device_index=self.device_index)
+
+    def _read_frame(self, recorder):
+        started = time.perf_counter()
+        pcm = recorder.read()
+        self.stats.read_wait.record(time.perf_counter() - started)
+        # Hub readers know how far behind the mic they already are.
+        backlog = recorder.backlog() if hasattr(recorder, "backlog") else 0
+        return np.asarray(pcm, dtype=np.int16), time.monotonic() - backlog / SAMPLE_RATE
+
+    def _capture_loop(self, recorder, frames, stop, resolve):
+        """Capture thread: read frames and queue them, dropping the oldest when full."""
+        try:
+            while not stop.is_set():
+                item = self._read_frame(recorder)
+                while True:
+                    try:
+                        frames.put_nowait(item)
+                        break
+                    except queue.Full:
+                        try:
+                            frames.get_nowait()
+                            self.stats.dropped += 1
+                        except queue.Empty:
+                            pass
+        except Exception as e:
+            resolve(error=e)
+
+    def _inference_loop(self, recorder, frames, stop, policy, resolve):
+        """Inference thread: score frames and resolve on the first trigger."""
+        stats = self.stats
+        active = self._active
+        consecutive = [0] * len(active.model_keys)
+        journal = self.journal
+        try:
+            if journal is not None:
+                journal.open(active.model_keys)
+            while not stop.is_set():
+                if frames is None:
+                    frame, captured = self._read_frame(recorder)
+                else:
+                    try:
+                        frame, captured = frames.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                lag = time.monotonic() - captured
+                if policy == "skip_to_latest" and lag > self.max_lag_s and not frames.empty():
+                    # Stall catch-up: everything queued is already late, so score
+                    # only the newest frame instead of replaying the backlog.
+                    skipped = 0
+                    while True:
+                        try:
+                            frame, captured = frames.get_nowait()
+                            skipped += 1
+                        except queue.Empty:
+                            break
+                    stats.coalesced += skipped
+                    stats.stalls += 1
+                    lag = time.monotonic() - captured
+                stats.frames += 1
+                stats.lag_s = lag
+                stats.max_lag_s = max(stats.max_lag_s, lag)
+                stats.queue_depth = frames.qsize() if frames is not None else 0
+                stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+
+                if self._active is not active:
+                    # Hot reload landed between frames: switch generations here.
+                    if self._active.model is not active.model:
+                        self._reset(self._active)
+                        if self.adaptive is not None:
+                            self.adaptive.reset(len(self._active.model_keys), self._active.keywords)
+                    active = self._active
+                    consecutive = [0] * len(active.model_keys)
+                    if journal is not None:
+                        journal.open(active.model_keys)
+                if journal is not None:
+                    journal.add_audio(frame)
+                started = time.monotonic()
+                results = self._predict(active, frame)
+                now = time.monotonic()
+                if now - started > FRAME_S:
+                    stats.overruns += 1
+                if results:
+                    stats.end_to_end.record(now - captured)
+                if self.stats_log_interval_s and now >= self._next_stats_log:
+                    self._next_stats_log = now + self.stats_log_interval_s
+                    log.info("Wake-word inference: %s", self.latency_stats())
+                if not results:
+                    consecutive = [0] * len(active.model_keys)
+                    if self.adaptive is not None:
+                        self.adaptive.reset_smoothing()
+                if journal is not None:
+                    wall = time.time() - (time.monotonic() - captured)
+                    if not results:
+                        # Gated frame: keep the per-frame timeline without holes.
+                        journal.append(wall, [0.0] * len(active.model_keys))
+                for j, scores in enumerate(results):
+                    raw = [scores.get(key, 0.0) for key in active.model_keys]
+                    values, limits = raw, active.thresholds
+                    if self.adaptive is not None:
+                        values, limits = self.adaptive.update(raw, limits, active.keywords)
+                    fired = None
+                    for i in range(len(active.model_keys)):
+                        if values[i] >= limits[i]:
+                            consecutive[i] += 1
+                            if consecutive[i] >= active.trigger_frames and fired is None:
+                                fired = i
+                        else:
+                            consecutive[i] = 0
+                    if journal is not None and (j == len(results) - 1 or fired is not None):
+                        # Warm-up results belong to the frames before this one, which
+                        # were journaled as gated when they arrived.
+                        journal.append(wall - (len(results) - 1 - j) * FRAME_S, raw,
+                                       0 if fired is None else fired + 1)
+                    if fired is not None:
+                        log.debug("Wake word %s: score %.3f >= %.3f", active.keywords[fired],
+                                  values[fired], limits[fired])
+                        if journal is not None:
+                            journal.trigger(active.keywords[fired], wall)
+                        resolve(result=(fired, active.keywords[fired]))
+                        return
+        except Exception as e:
+            resolve(error=e)
 
     async def wait_for_wakeword(self):
         """
         Listen until one of the wake words fires.
 
+        Capture and inference run on two dedicated threads joined by a bounded
+        queue, so a slow predict never stalls the mic read and neither competes
+        for the event loop's default executor. `stats` records queue depth, lag
+        behind real time and dropped/coalesced frames. Sources that are not real
+        time (ReplayHub) always use the lossless "block" policy, which reads on
+        the inference thread so nothing past the trigger frame is consumed.
+
         Returns:
             (keyword_index: int, keyword: str)
         """
-        recorder = PvRecorder(frame_length=FRAME_LENGTH, device_index=self.device_index)
         loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def resolve(result=None, error=None):
+            def settle():
+                if done.done():
+                    return
+                if error is not None:
+                    done.set_exception(error)
+                else:
+                    done.set_result(result)
+            loop.call_soon_threadsafe(settle)
 
-        self._model.reset()
-        consecutive = [0] * len(self._model_keys)
+        policy = self.backpressure if getattr(self.hub, "realtime", True) else "block"
+        frames = None if policy == "block" else queue.Queue(maxsize=self.queue_frames)
+        stop = threading.Event()
+        recorder = self._open_recorder()
+        threads = [threading.Thread(target=self._inference_loop, args=(recorder, frames, stop, policy, resolve),
+                                    name="wakeword-inference", daemon=True)]
+        if frames is not None:
+            threads.append(threading.Thread(target=self._capture_loop, args=(recorder, frames, stop, resolve),
+                                            name="wakeword-capture", daemon=True))
+
+        self._reset(self._active)
         try:
             recorder.start()
-            while True:
-                pcm = await loop.run_in_executor(None, recorder.read)
-                frame = np.asarray(pcm, dtype=np.int16)
-                scores = await loop.run_in_executor(None, self._model.predict, frame)
-                for i, key in enumerate(self._model_keys):
-                    if scores.get(key, 0.0) >= self._thresholds[i]:
-                        consecutive[i] += 1
-                        if consecutive[i] >= self.trigger_frames:
-                            return i, self._keywords[i]
-                    else:
-                        consecutive[i] = 0
+            for t in threads:
+                t.start()
+            return await done
         finally:
+            stop.set()
+            # The capture thread may be inside recorder.read(); PvRecorder must not
+            # be deleted under it, so wait (at most a frame) for both threads.
+            await loop.run_in_executor(None, _join_started, threads)
             recorder.delete()
+            if self.journal is not None:
+                self.journal.flush()
+            log.debug("Wake-word inference stats: %s", self.stats.as_dict())
 
 
 def main():
@@ -139,17 +909,30 @@ def main():
         '--audio_device_index', type=int, default=-1,
         help='Index of input audio device. Default: -1 (system default).'
     )
+    parser.add_argument('--gate', choices=['rms', 'vad'], help='Skip inference on silent frames')
+    parser.add_argument('--adaptive', action='store_true', help='Trigger relative to the learned background scores')
+    parser.add_argument('--smoothing', choices=SMOOTHING_MODES, default='none')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='Re-measure the tflite thread count for this board and cache it')
     args = parser.parse_args()
 
+    if args.calibrate:
+        print(f"Using {calibrate_threads(args.model_paths, force=True)} tflite thread(s)")
+
     detector = WakeWordDetector(
         model_paths=args.model_paths,
         threshold=args.threshold,
         device_index=args.audio_device_index,
+        silence_gate=SilenceGate(use_vad=args.gate == 'vad') if args.gate else None,
+        adaptive=AdaptiveThresholds(smoothing=args.smoothing) if args.adaptive or args.smoothing != 'none' else None,
     )
     print(f"Listening for {detector.keywords} ... Ctrl+C to stop")
     while True:
         index, keyword = asyncio.run(detector.wait_for_wakeword())
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] detected '{keyword}' (index {index})")
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] detected '{keyword}' (index {index}), "
+              f"inference duty cycle {detector.stats.duty_cycle:.0%}, "
+              f"real-time factor {detector.stats.real_time_factor:.2f}, "
+              f"predict p99 {detector.stats.predict.percentile(99) * 1000:.0f}ms")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,224 @@
+import os
+import sys
+import glob
+import json
+import hashlib
+import argparse
+
+import numpy as np
+
+from replay import load_wav
+
+FRAME_S = 0.08  # openWakeWord frame: 1280 samples at 16 kHz
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _gate_config(gate) -> dict:
+    """The SilenceGate settings that change which frames get scored; None without a gate."""
+    if gate is None:
+        return None
+    return {k: getattr(gate, k) for k in ("ratio", "min_rms", "hangover_frames", "warmup_frames",
+                                           "use_vad", "vad_aggressiveness", "active_creep")}
+
+
+class ScoreCache:
+    """
+    Per-frame score matrices for a corpus, cached on disk.
+
+    Scoring is the only expensive step (one Model.predict per 80 ms frame), so
+    each WAV is scored once per model set and the (n_frames, n_keywords) matrix
+    is stored as .npz keyed by the content hashes of the WAV and of every model
+    file, plus the silence gate settings (gated frames score 0); editing or
+    retraining a model invalidates exactly the right entries.
+    """
+
+    def __init__(self, cache_dir: str, detector):
+        self.cache_dir = cache_dir
+        self.detector = detector
+        models = hashlib.sha1()
+        for path in detector.model_paths:
+            models.update(_file_digest(path).encode())
+        models.update(json.dumps(_gate_config(detector.silence_gate), sort_keys=True).encode())
+        self._models_digest = models.hexdigest()[:16]
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def scores(self, wav_path: str) -> np.ndarray:
+        key = f"{_file_digest(wav_path)[:16]}_{self._models_digest}.npz"
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isfile(path):
+            with np.load(path) as data:
+                if list(data["keywords"]) == self.detector.keywords:
+                    return data["scores"]
+        scores = self.detector.score_frames(load_wav(wav_path))
+        np.savez_compressed(path, scores=scores, keywords=np.array(self.detector.keywords))
+        return scores
+
+
+def trigger_frames_matrix(scores: np.ndarray, thresholds: np.ndarray, trigger_frames: int,
+                          refractory_frames: int) -> list:
+    """
+    Vectorized replay of WakeWordDetector's trigger rule for a whole threshold grid.
+
+    `scores` is one keyword's score stream (T,). For each threshold, returns the
+    frame indices at which the live loop would fire: the frame that completes each
+    run of `trigger_frames` consecutive frames at or above threshold. After a trigger
+    the live detector stops listening (intro, utterance capture, model reset), so
+    triggers within `refractory_frames` of the previous one are discarded.
+    """
+    above = scores[None, :] >= thresholds[:, None]                  # (G, T)
+    csum = np.cumsum(above, axis=1, dtype=np.int32)
+    k = trigger_frames
+    window = csum.copy()
+    window[:, k:] -= csum[:, :-k]
+    full = window >= k
+    onset = full & ~np.concatenate((np.zeros((len(thresholds), 1), dtype=bool), full[:, :-1]), axis=1)
+
+    fired = []
+    for row in onset:
+        frames = np.flatnonzero(row)
+        kept = []
+        last = -refractory_frames - 1
+        for f in frames:  # sparse: only the rising edges, not every frame
+            if f - last > refractory_frames:
+                kept.append(f)
+                last = f
+        fired.append(np.asarray(kept, dtype=np.int64))
+    return fired
+
+
+def evaluate(corpus: list, keyword: str, column: int, thresholds: np.ndarray, trigger_frames: int,
+             refractory_s: float, early_s: float, late_s: float) -> list:
+    """
+    Detection rate, false accepts per hour and latency for one keyword over the grid.
+
+    `corpus` holds (scores, labels, duration_s) per file; a label is the time
+    (seconds) at which the keyword finished being spoken. A trigger within
+    [label - early_s, label + late_s] detects that label; every other trigger of
+    this keyword is a false accept.
+    """
+    refractory = int(round(refractory_s / FRAME_S))
+    hits = np.zeros(len(thresholds), dtype=np.int64)
+    false_accepts = np.zeros(len(thresholds), dtype=np.int64)
+    latencies = [[] for _ in thresholds]
+    positives = 0
+    hours = 0.0
+
+    for scores, labels, duration_s in corpus:
+        hours += duration_s / 3600.0
+        label_times = np.array(sorted(labels), dtype=np.float64)
+        positives += len(label_times)
+        fired = trigger_frames_matrix(scores[:, column], thresholds, trigger_frames, refractory)
+        for g, frames in enumerate(fired):
+            times = (frames + 1) * FRAME_S  # a frame's score is known at its end
+            if len(label_times) == 0:
+                false_accepts[g] += len(times)
+                continue
+            # (labels, triggers) match matrix; each label counts once, each trigger once.
+            delta = times[None, :] - label_times[:, None]
+            match = (delta >= -early_s) & (delta <= late_s)
+            detected = match.any(axis=1)
+            hits[g] += int(detected.sum())
+            false_accepts[g] += int((~match.any(axis=0)).sum())
+            first = np.where(match, delta, np.inf).min(axis=1)
+            latencies[g].extend(first[detected].tolist())
+
+    rows = []
+    for g, th in enumerate(thresholds):
+        lat = np.array(latencies[g])
+        rows.append({
+            "keyword": keyword,
+            "trigger_frames": trigger_frames,
+            "threshold": round(float(th), 4),
+            "detection_rate": hits[g] / positives if positives else float('nan'),
+            "fa_per_hour": false_accepts[g] / hours if hours else float('nan'),
+            "latency_ms_median": float(np.median(lat) * 1000) if len(lat) else float('nan'),
+            "latency_ms_p90": float(np.percentile(lat, 90) * 1000) if len(lat) else float('nan'),
+        })
+    return rows
+
+
+def load_corpus(corpus_dir: str, labels_file: str):
+    """WAV paths under corpus_dir and their labels ({relative path: [{keyword, time}]})."""
+    paths = sorted(glob.glob(os.path.join(corpus_dir, '**', '*.wav'), recursive=True))
+    labels = {}
+    if labels_file and os.path.isfile(labels_file):
+        with open(labels_file) as f:
+            labels = json.load(f)
+    return paths, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score a labeled corpus once, then sweep wake-word thresholds and trigger_frames.")
+    parser.add_argument('corpus_dir', help='Directory of WAV recordings (searched recursively)')
+    parser.add_argument('--labels', help='JSON: {"rel/path.wav": [{"keyword": "hey-octo", "time": 3.2}, ...]}; '
+                                         'default <corpus_dir>/labels.json. Unlabeled files are negatives.')
+    parser.add_argument('--model_paths', nargs='+', default=sorted(glob.glob('models/*.tflite')))
+    parser.add_argument('--cache_dir', default='.wakeword_scores')
+    parser.add_argument('--thresholds', type=float, nargs=3, default=[0.1, 0.95, 0.05], metavar=('START', 'STOP', 'STEP'))
+    parser.add_argument('--trigger_frames', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--refractory_s', type=float, default=3.0,
+                        help='Seconds the live box is deaf after a trigger (intro + utterance capture)')
+    parser.add_argument('--early_s', type=float, default=0.5, help='Accept triggers this long before the label time')
+    parser.add_argument('--late_s', type=float, default=1.5, help='Accept triggers this long after the label time')
+    parser.add_argument('--max_fa_per_hour', type=float, default=0.5, help='Budget used to pick a recommended setting')
+    parser.add_argument('--gate', choices=['none', 'rms', 'vad'], default='rms',
+                        help='Silence gate to score with; main.py runs the default rms gate, so tune with it too')
+    parser.add_argument('--json', help='Write the full sweep to this JSON file')
+    args = parser.parse_args()
+
+    from wakeword import WakeWordDetector, SilenceGate
+
+    paths, labels = load_corpus(args.corpus_dir, args.labels or os.path.join(args.corpus_dir, 'labels.json'))
+    if not paths:
+        print(f"No WAV files under {args.corpus_dir}.")
+        sys.exit(1)
+
+    gate = SilenceGate(use_vad=args.gate == 'vad') if args.gate != 'none' else None
+    detector = WakeWordDetector(model_paths=args.model_paths, silence_gate=gate)
+    cache = ScoreCache(args.cache_dir, detector)
+    scored = []
+    for i, path in enumerate(paths, 1):
+        scores = cache.scores(path)
+        rel = os.path.relpath(path, args.corpus_dir).replace(os.sep, '/')
+        scored.append((scores, labels.get(rel, []), len(scores) * FRAME_S))
+        print(f"\rScored {i}/{len(paths)}", end='', file=sys.stderr)
+    print(file=sys.stderr)
+
+    start, stop, step = args.thresholds
+    grid = np.arange(start, stop + step / 2, step)
+    results = []
+    for column, keyword in enumerate(detector.keywords):
+        corpus = [(s, [l["time"] for l in lab if l["keyword"] == keyword], d) for s, lab, d in scored]
+        rows = []
+        for k in args.trigger_frames:
+            rows.extend(evaluate(corpus, keyword, column, grid, k, args.refractory_s, args.early_s, args.late_s))
+        results.extend(rows)
+
+        print(f"\n{keyword} ({sum(len(c[1]) for c in corpus)} positives)")
+        print(f"  {'frames':>6} {'thresh':>6} {'detect':>7} {'FA/h':>7} {'lat50':>7} {'lat90':>7}")
+        for r in rows:
+            print(f"  {r['trigger_frames']:>6} {r['threshold']:>6.2f} {r['detection_rate']:>7.1%} "
+                  f"{r['fa_per_hour']:>7.2f} {r['latency_ms_median']:>6.0f}ms {r['latency_ms_p90']:>6.0f}ms")
+        within = [r for r in rows if r['fa_per_hour'] <= args.max_fa_per_hour]
+        if within:
+            best = max(within, key=lambda r: (r['detection_rate'], -r['latency_ms_median']))
+            print(f"  recommended: threshold={best['threshold']:.2f} trigger_frames={best['trigger_frames']} "
+                  f"({best['detection_rate']:.1%} detected, {best['fa_per_hour']:.2f} FA/h)")
+        else:
+            print(f"  no setting stays under {args.max_fa_per_hour} FA/h")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()